@@ -5,6 +5,7 @@ Implements JWT-based authentication with API key support.
 
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from functools import lru_cache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -128,8 +129,13 @@ async def get_current_token(credentials: HTTPAuthorizationCredentials = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+@lru_cache(maxsize=None)
 def require_permission(permission: str):
-    """Decorator to require specific permission."""
+    """Decorator to require specific permission.
+    
+    Memoized per permission so repeated `Depends(require_permission(p))`
+    share one callable and FastAPI runs the check once per request.
+    """
     async def permission_checker(token_data: TokenData = Depends(get_current_token)):
         if not check_permission(token_data, permission):
             raise HTTPException(
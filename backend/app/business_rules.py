@@ -1,5 +1,6 @@
+from typing import List, Optional
 from .models import DeckSections, NormalizedDeck
 MIN_MAIN = 60
 SIDE_DEFAULT = 15
-def apply_mtgo_land_fix(deck: DeckSections) -> DeckSections: return deck
+def apply_mtgo_land_fix(deck: DeckSections, text_lines: Optional[List[str]] = None) -> DeckSections: return deck
 def validate_and_fill(normalized: NormalizedDeck) -> NormalizedDeck: return normalized
\ No newline at end of file
@@ -125,6 +125,28 @@ class CacheManager:
         key = self._make_key("ocr", image_hash)
         return self.get(key)
     
+    def cache_ocr_result_bytes(self, image_hash: str, payload: bytes, ttl: int = 3600) -> bool:
+        """Cache a JSON-encoded OCR result as-is (no pickle round-trip)."""
+        key = self._make_key("ocrjson", image_hash)
+        try:
+            if self.enabled and self.redis_client:
+                return self.redis_client.setex(key, ttl, payload)
+            return self.set(key, payload, ttl)
+        except Exception as e:
+            logger.error(f"Cache set error for {key}: {e}")
+        return False
+    
+    def get_ocr_result_bytes(self, image_hash: str) -> Optional[bytes]:
+        """Get a JSON-encoded OCR result cached by cache_ocr_result_bytes."""
+        key = self._make_key("ocrjson", image_hash)
+        try:
+            if self.enabled and self.redis_client:
+                return self.redis_client.get(key)
+            return self.memory_cache.get(key)
+        except Exception as e:
+            logger.error(f"Cache get error for {key}: {e}")
+        return None
+    
     def cache_scryfall_card(self, card_name: str, card_data: Dict, ttl: int = 86400) -> bool:
         """Cache Scryfall card data (24 hour TTL)."""
         key = self._make_key("scryfall", self._hash_key(card_name.lower()))
@@ -11,12 +11,19 @@ class Settings:
     ENABLE_SUPERRES: bool = os.getenv("ENABLE_SUPERRES","false").lower()=="true"
     OCR_MIN_CONF: float = float(os.getenv("OCR_MIN_CONF", 0.62))
     OCR_MIN_LINES: int = int(os.getenv("OCR_MIN_LINES", 10))
+    # On GPU, OCR all preprocessing variants in one readtext_batched call
+    OCR_GPU_BATCH: bool = os.getenv("OCR_GPU_BATCH","true").lower()=="true"
+    # Concurrent requests' batches are coalesced for up to this long / this many images
+    OCR_BATCH_WAIT_MS: int = int(os.getenv("OCR_BATCH_WAIT_MS", 50))
+    OCR_BATCH_MAX_IMAGES: int = int(os.getenv("OCR_BATCH_MAX_IMAGES", 16))
 
     # Scryfall check (toujours)
     ALWAYS_VERIFY_SCRYFALL: bool = os.getenv("ALWAYS_VERIFY_SCRYFALL","true").lower()=="true"
     ENABLE_SCRYFALL_ONLINE_FALLBACK: bool = os.getenv("ENABLE_SCRYFALL_ONLINE_FALLBACK","true").lower()=="true"
     SCRYFALL_API_TIMEOUT: int = int(os.getenv("SCRYFALL_API_TIMEOUT", 5))
     SCRYFALL_API_RATE_LIMIT_MS: int = int(os.getenv("SCRYFALL_API_RATE_LIMIT_MS", 120))
+    SCRYFALL_CONCURRENCY: int = int(os.getenv("SCRYFALL_CONCURRENCY", 4))
+    SCRYFALL_MAX_RETRIES: int = int(os.getenv("SCRYFALL_MAX_RETRIES", 3))
 
     # Cache files
     SCRYFALL_DB: str = os.getenv("SCRYFALL_DB","./app/data/scryfall_cache.sqlite")
@@ -26,10 +33,13 @@ class Settings:
     # General
     MAX_IMAGE_MB: int = int(os.getenv("MAX_IMAGE_MB", 8))
     FUZZY_MATCH_TOPK: int = int(os.getenv("FUZZY_MATCH_TOPK", 5))
+    # Image cache-key hash: "blake3" (if installed) or "sha256" to keep legacy keys
+    IMAGE_HASH_ALGO: str = os.getenv("IMAGE_HASH_ALGO", "blake3").lower()
 
     # Redis (optionnel)
     USE_REDIS: bool = os.getenv("USE_REDIS","false").lower()=="true"
     REDIS_URL: str = os.getenv("REDIS_URL","redis://localhost:6379/0")
+    REDIS_POOL_SIZE: int = int(os.getenv("REDIS_POOL_SIZE", 10))
     
     # GDPR & Data Retention
     GDPR_ENABLED: bool = os.getenv("GDPR_ENABLED", "true").lower() == "true"
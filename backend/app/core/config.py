@@ -73,6 +73,11 @@ class Settings(BaseSettings):
     CORS_ALLOW_METHODS: List[str] = Field(["GET", "POST"], env="CORS_ALLOW_METHODS")
     CORS_ALLOW_HEADERS: List[str] = Field(["*"], env="CORS_ALLOW_HEADERS")
     
+    # Health endpoint security
+    HEALTH_EXPOSE_INTERNAL: bool = Field(False, env="HEALTH_EXPOSE_INTERNAL")
+    HEALTH_ALLOWED_IPS: str = Field("127.0.0.1,::1", env="HEALTH_ALLOWED_IPS")  # Comma-separated
+    HEALTH_REQUIRE_AUTH: bool = Field(True, env="HEALTH_REQUIRE_AUTH")
+    
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = Field(True, env="RATE_LIMIT_ENABLED")
     RATE_LIMIT_PER_MINUTE: int = Field(30, env="RATE_LIMIT_PER_MINUTE")
@@ -3,7 +3,8 @@ Redis-based job storage for Screen2Deck.
 Provides persistent job tracking with TTL and atomic operations.
 """
 
-import json
+import orjson
+import asyncio
 import hashlib
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
@@ -13,6 +14,10 @@ from redis.exceptions import RedisError
 from ..core.config import settings
 from ..telemetry import logger
 
+# Jobs currently in "processing", kept by every writer (API and Celery) on
+# state transitions so the active-jobs gauge reads one key instead of scanning
+PROCESSING_COUNT_KEY = "stats:jobs_processing"
+
 class JobStorage:
     """
     Redis-backed job storage with automatic expiration and atomic operations.
@@ -31,6 +36,11 @@ class JobStorage:
         self.redis_client = None
         self.key_prefix = "job:"
         self.index_prefix = "idx:"
+        self.health_interval = 1.0
+        self._healthy = False
+        self._health_task: Optional[asyncio.Task] = None
+        # Last ping failed (the failure is logged once until it recovers)
+        self._redis_down = False
         
     async def connect(self):
         """Establish Redis connection."""
@@ -47,10 +57,54 @@ class JobStorage:
     
     async def disconnect(self):
         """Close Redis connection."""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
         if self.redis_client:
             await self.redis_client.close()
             self.redis_client = None
     
+    async def healthy(self) -> bool:
+        """
+        Cached Redis health flag for readiness probes.
+        
+        The first call pings Redis and starts a background poller that
+        refreshes the flag every `health_interval` seconds, so probes
+        never wait on a Redis round trip themselves.
+        
+        Returns:
+            True if the last ping succeeded
+        """
+        if self._health_task is None or self._health_task.done():
+            self._healthy = await self._ping()
+            self._health_task = asyncio.create_task(self._poll_health())
+        return self._healthy
+    
+    async def _ping(self) -> bool:
+        """Ping Redis, connecting first if needed.
+        
+        Logs on state changes only (down once, recovered once), not on
+        every failed poll.
+        """
+        try:
+            await self.connect()
+            await self.redis_client.ping()
+        except Exception as e:
+            if not self._redis_down:
+                self._redis_down = True
+                logger.error(f"Redis health check failed: {e}")
+            return False
+        if self._redis_down:
+            self._redis_down = False
+            logger.info("Redis health check recovered")
+        return True
+    
+    async def _poll_health(self):
+        """Refresh the cached health flag until cancelled."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            self._healthy = await self._ping()
+    
     def _job_key(self, job_id: str) -> str:
         """Generate Redis key for job."""
         return f"{self.key_prefix}{job_id}"
@@ -98,7 +152,7 @@ class JobStorage:
         # Use SET NX (set if not exists) for atomic creation
         created = await self.redis_client.set(
             key,
-            json.dumps(job_data),
+            orjson.dumps(job_data),
             nx=True,  # Only set if not exists
             ex=int(self.ttl.total_seconds())
         )
@@ -147,7 +201,7 @@ class JobStorage:
         data = await self.redis_client.get(key)
         
         if data:
-            return json.loads(data)
+            return orjson.loads(data)
         return None
     
     async def update_job(
@@ -179,7 +233,14 @@ class JobStorage:
             return False
         
         # Update fields
+        delta = 0
         if state is not None:
+            previous = job_data.get("state")
+            if state != previous:
+                if state == "processing":
+                    delta = 1
+                elif previous == "processing":
+                    delta = -1
             job_data["state"] = state
         if progress is not None:
             job_data["progress"] = progress
@@ -192,11 +253,15 @@ class JobStorage:
         
         # Save updated data
         key = self._job_key(job_id)
-        await self.redis_client.set(
-            key,
-            json.dumps(job_data),
-            ex=int(self.ttl.total_seconds())
-        )
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(
+                key,
+                orjson.dumps(job_data),
+                ex=int(self.ttl.total_seconds())
+            )
+            if delta:
+                pipe.incrby(PROCESSING_COUNT_KEY, delta)
+            await pipe.execute()
         
         logger.info(f"Updated job {job_id}: state={state}, progress={progress}")
         return True
@@ -253,14 +318,14 @@ class JobStorage:
             offset + limit - 1
         )
         
-        # Fetch job data
-        jobs = []
-        for job_id in job_ids:
-            job = await self.get_job(job_id)
-            if job:
-                jobs.append(job)
+        if not job_ids:
+            return []
         
-        return jobs
+        # Fetch all job data in a single round trip
+        values = await self.redis_client.mget(
+            [self._job_key(job_id) for job_id in job_ids]
+        )
+        return [orjson.loads(data) for data in values if data]
     
     async def cleanup_expired(self) -> int:
         """
@@ -300,6 +365,17 @@ class JobStorage:
         
         return expired_count
     
+    async def processing_count(self) -> int:
+        """
+        Number of jobs in "processing", across API and Celery processes.
+        
+        Returns:
+            Current value of the shared transition counter (never negative)
+        """
+        await self.connect()
+        value = await self.redis_client.get(PROCESSING_COUNT_KEY)
+        return max(0, int(value or 0))
+    
     async def get_stats(self) -> Dict[str, Any]:
         """
         Get storage statistics.
@@ -331,7 +407,7 @@ class JobStorage:
             for key in keys:
                 data = await self.redis_client.get(key)
                 if data:
-                    job = json.loads(data)
+                    job = orjson.loads(data)
                     state = job.get("state", "unknown")
                     stats["total"] += 1
                     if state in stats:
@@ -106,8 +106,12 @@ def track_duration(histogram: Histogram):
         histogram.observe(duration)
 
 def create_metrics_app():
-    """Create ASGI app for metrics endpoint."""
-    return make_asgi_app(registry=registry)
+    """Create ASGI app for metrics endpoint.
+    
+    Compression is disabled: gzipping the exposition body on every
+    cluster-local scrape costs more CPU than it saves in bandwidth.
+    """
+    return make_asgi_app(registry=registry, disable_compression=True)
 
 def get_metrics_summary() -> dict:
     """Get current metrics as dict (for logging/debugging)."""
@@ -4,12 +4,11 @@ Uses in-memory storage with Redis fallback.
 """
 
 import time
-from typing import Dict, Optional
+from typing import Dict, Optional, NamedTuple
 from collections import defaultdict, deque
 from datetime import datetime, timedelta
 import redis
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
 
 from ..config import settings
 from ..telemetry import logger
@@ -29,6 +28,13 @@ if settings.USE_REDIS:
 memory_storage: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
 
 
+class RateLimitExceeded(NamedTuple):
+    """Details of a rejected request, ready to be turned into a 429."""
+    message: str
+    retry_after: int
+    headers: Dict[str, str]
+
+
 class RateLimiter:
     """
     Simple rate limiter with sliding window.
@@ -52,12 +58,22 @@ class RateLimiter:
         self.window_seconds = 60
         self.use_redis = use_redis and redis_client is not None
         self.key_prefix = key_prefix
+        self.message = f"Rate limit exceeded. Maximum {requests_per_minute} requests per minute."
     
     def _get_client_ip(self, request: Request) -> str:
         """
         Extract client IP from request.
         Handles X-Forwarded-For for proxied requests.
+        The result is memoized on request.state for the request's lifetime.
         """
+        cached_ip = getattr(request.state, "client_ip", None)
+        if cached_ip:
+            return cached_ip
+        request.state.client_ip = ip = self._extract_client_ip(request)
+        return ip
+    
+    def _extract_client_ip(self, request: Request) -> str:
+        """Extract client IP from proxy headers or the socket peer."""
         # Check for forwarded IP (when behind proxy/load balancer)
         forwarded_for = request.headers.get("X-Forwarded-For")
         if forwarded_for:
@@ -145,7 +161,7 @@ class RateLimiter:
         remaining = self.requests_per_minute - len(request_times)
         return True, max(0, remaining)
     
-    async def check_request(self, request: Request) -> Optional[JSONResponse]:
+    async def check_request(self, request: Request) -> Optional[RateLimitExceeded]:
         """
         Check if request is allowed under rate limit.
         
@@ -153,7 +169,7 @@ class RateLimiter:
             request: FastAPI request object
             
         Returns:
-            None if allowed, JSONResponse with 429 if rate limited
+            None if allowed, RateLimitExceeded if rate limited
         """
         ip = self._get_client_ip(request)
         
@@ -172,13 +188,10 @@ class RateLimiter:
         
         if not allowed:
             logger.warning(f"Rate limit exceeded for IP: {ip}")
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "error": "rate_limit_exceeded",
-                    "message": f"Rate limit exceeded. Maximum {self.requests_per_minute} requests per minute.",
-                    "retry_after": self.window_seconds
-                },
+            headers["Retry-After"] = str(self.window_seconds)
+            return RateLimitExceeded(
+                message=self.message,
+                retry_after=self.window_seconds,
                 headers=headers
             )
         
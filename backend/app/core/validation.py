@@ -231,6 +231,10 @@ class ImageValidator:
         return True
 
 
+# ASCII control characters that are not whitespace, for str.translate deletion
+_ASCII_CONTROLS = dict.fromkeys(c for c in (*range(32), 127) if not chr(c).isspace())
+
+
 class TextValidator:
     """
     Validate and sanitize text inputs.
@@ -250,8 +254,11 @@ class TextValidator:
         if not name:
             return ""
         
-        # Remove control characters
-        name = "".join(ch for ch in name if ch.isprintable() or ch.isspace())
+        # Remove control characters (ASCII names, the usual case: one C-level pass)
+        if name.isascii():
+            name = name.translate(_ASCII_CONTROLS)
+        else:
+            name = "".join(ch for ch in name if ch.isprintable() or ch.isspace())
         
         # Normalize whitespace
         name = " ".join(name.split())
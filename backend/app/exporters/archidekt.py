@@ -1,6 +1,10 @@
+import csv, io
 from ..models import NormalizedDeck
 def export_archidekt(deck: NormalizedDeck) -> str:
-    rows = ["Count,Name,Categories"]
-    for c in deck.main: rows.append(f"{c.qty},{c.name},Mainboard")
-    for c in deck.side: rows.append(f"{c.qty},{c.name},Sideboard")
-    return "\n".join(rows)
\ No newline at end of file
+    # csv quotes names containing commas ("Teferi, Time Raveler")
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(("Count", "Name", "Categories"))
+    w.writerows((c.qty, c.name, "Mainboard") for c in deck.main)
+    w.writerows((c.qty, c.name, "Sideboard") for c in deck.side)
+    return buf.getvalue()[:-1]
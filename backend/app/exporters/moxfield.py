@@ -1,3 +1,7 @@
 from ..models import NormalizedDeck
 def export_moxfield(deck: NormalizedDeck) -> str:
-    return "\n".join([f"{c.qty} {c.name}" for c in deck.main + deck.side])
\ No newline at end of file
+    n = len(deck.main)
+    lines = [None] * (n + len(deck.side))
+    for i, c in enumerate(deck.main): lines[i] = f"{c.qty} {c.name}"
+    for i, c in enumerate(deck.side, n): lines[i] = f"{c.qty} {c.name}"
+    return "\n".join(lines)
@@ -1,7 +1,15 @@
+from typing import Iterator
 from ..models import NormalizedDeck
+def export_mtga_iter(deck: NormalizedDeck) -> Iterator[bytes]:
+    """Yield the MTGA export line by line, already UTF-8 encoded, for streaming responses."""
+    yield b"Deck"
+    for c in deck.main: yield f"\n{c.qty} {c.name}".encode()
+    yield b"\n\nSideboard"
+    for c in deck.side: yield f"\n{c.qty} {c.name}".encode()
 def export_mtga(deck: NormalizedDeck) -> str:
-    lines = ["Deck"]
-    for c in deck.main: lines.append(f"{c.qty} {c.name}")
-    lines.append(""); lines.append("Sideboard")
-    for c in deck.side: lines.append(f"{c.qty} {c.name}")
-    return "\n".join(lines)
\ No newline at end of file
+    n = len(deck.main)
+    lines = [None] * (n + len(deck.side) + 3)
+    lines[0] = "Deck"; lines[n + 1] = ""; lines[n + 2] = "Sideboard"
+    for i, c in enumerate(deck.main, 1): lines[i] = f"{c.qty} {c.name}"
+    for i, c in enumerate(deck.side, n + 3): lines[i] = f"{c.qty} {c.name}"
+    return "\n".join(lines)
@@ -1,3 +1,7 @@
 from ..models import NormalizedDeck
 def export_tappedout(deck: NormalizedDeck) -> str:
-    return "\n".join([f"{c.qty} {c.name}" for c in deck.main]) + "\n\nSideboard\n" + "\n".join([f"{c.qty} {c.name}" for c in deck.side])
\ No newline at end of file
+    main = [None] * len(deck.main)
+    for i, c in enumerate(deck.main): main[i] = f"{c.qty} {c.name}"
+    side = [None] * len(deck.side)
+    for i, c in enumerate(deck.side): side[i] = f"{c.qty} {c.name}"
+    return "\n".join(main) + "\n\nSideboard\n" + "\n".join(side)
@@ -3,9 +3,13 @@ Refactored main application with proper security, job storage, and validation.
 Production-ready FastAPI application for Screen2Deck.
 """
 
+import asyncio
+import multiprocessing
+import os
 import uuid
 import time
 from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
 
 # ONLINE-ONLY mode - No offline support
@@ -13,8 +17,6 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
-import numpy as np
-import cv2
 
 # Initialize determinism SECOND
 from .core.determinism import init_determinism
@@ -40,8 +42,9 @@ from .models import (
     DeckSections, CardEntry, NormalizedDeck
 )
 from .error_taxonomy import *
-from .pipeline.preprocess import preprocess_variants
-from .pipeline.ocr import run_easyocr_best_of, run_vision_fallback
+from .pipeline.preprocess import most_ink, preprocess_bytes
+from .pipeline.ocr import run_easyocr_best_of, run_vision_fallback, start_reader_warmup
+from .pipeline.lines import DECK_LINE_RX, should_use_fallback
 from .matching.fuzzy import score_candidates
 from .matching.scryfall_cache import scryfall_cache
 from .matching.scryfall_client import SCRYFALL
@@ -52,6 +55,10 @@ from .routers import health, metrics, auth_router, export_router
 FLAGS = FeatureFlags.get_all_flags()
 logger.info(f"Feature flags: {FLAGS}")
 
+# CPU-bound decode + preprocessing, created by the lifespan (not at import, so
+# Celery workers and the pool's own children don't build one)
+_preprocess_pool: Optional[ProcessPoolExecutor] = None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -64,6 +71,19 @@ async def lifespan(app: FastAPI):
     # Connect to Redis for job storage
     await job_storage.connect()
     
+    # Spawned, not forked (this process runs threads); workers start on first submit
+    global _preprocess_pool
+    _preprocess_pool = ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 2) // 2),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    
+    # Load the OCR reader in the background (not at import: see pipeline.ocr)
+    start_reader_warmup()
+    
+    # Prime the metrics gauges so the first scrape isn't stale
+    await metrics.start_metrics_sampler()
+    
     # Initialize Scryfall cache
     logger.info("Initializing Scryfall cache...")
     # scryfall_cache is already initialized
@@ -82,6 +102,10 @@ async def lifespan(app: FastAPI):
     # Disconnect from Redis
     await job_storage.disconnect()
     
+    # Stop the preprocessing workers
+    _preprocess_pool.shutdown(cancel_futures=True)
+    _preprocess_pool = None
+    
     # Close Scryfall cache
     await scryfall_cache.close()
     
@@ -266,30 +290,27 @@ async def process_ocr(content: bytes, job_id: str, trace_id: str) -> DeckResult:
         
         t0 = time.time()
         
-        # Decode image
-        img = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
-        if img is None:
+        # Decode + preprocess off the event loop: in the worker pool, or in a
+        # thread (OpenCV releases the GIL) when the lifespan didn't create it
+        if _preprocess_pool is not None:
+            loop = asyncio.get_running_loop()
+            variants = await loop.run_in_executor(_preprocess_pool, preprocess_bytes, content)
+        else:
+            variants = await asyncio.to_thread(preprocess_bytes, content)
+        if variants is None:
             raise ValueError("Cannot decode image")
         
         # Update progress
         await job_storage.update_job(job_id, progress=20)
         
-        # Multi-variant OCR
-        variants = preprocess_variants(img)
-        ocr_raw = run_easyocr_best_of(variants)
+        # Multi-variant OCR (releases the GIL; keep it off the loop too)
+        ocr_raw = await asyncio.to_thread(run_easyocr_best_of, variants)
         
         await job_storage.update_job(job_id, progress=40)
         
         # Fallback to Vision if needed
-        import re
-        def count_qty_lines(spans):
-            rx = re.compile(r"^\s*(\d+|[1-9]\dx)\s+\S+")
-            return sum(1 for s in spans if rx.match(s["text"].strip().lower()))
-        
-        if (ocr_raw["mean_conf"] < settings.OCR_MIN_CONF or 
-            count_qty_lines(ocr_raw["spans"]) < settings.OCR_MIN_LINES) and \
-           settings.ENABLE_VISION_FALLBACK:
-            best_img = max(variants, key=lambda im: cv2.countNonZero(im))
+        if should_use_fallback(ocr_raw, settings):
+            best_img = most_ink(variants)
             ocr_raw = run_vision_fallback(best_img)
         
         await job_storage.update_job(job_id, progress=60)
@@ -329,38 +350,24 @@ def parse_deck_sections(spans: list[OCRSpan]) -> DeckSections:
     """
     main_entries: list[CardEntry] = []
     side_entries: list[CardEntry] = []
-    section = "main"
+    section = main_entries
     
     for span in spans:
-        line = span.text.strip()
-        
-        # Check for sideboard marker
-        if line.lower().startswith("sideboard") or line.lower().startswith("sb"):
-            section = "side"
+        # One match per line decides marker vs entry
+        m = DECK_LINE_RX.match(span.text)
+        if m is None:
             continue
         
-        # Parse quantity and name
-        qty = 0
-        name = ""
-        parts = line.split(" ", 1)
-        
-        if len(parts) == 2:
-            if parts[0].isdigit():
-                qty = int(parts[0])
-                name = parts[1]
-            elif parts[0].lower().endswith("x") and parts[0][:-1].isdigit():
-                qty = int(parts[0][:-1])
-                name = parts[1]
+        # Sideboard marker
+        if m.group("side") is not None:
+            section = side_entries
+            continue
         
-        if qty > 0 and name:
+        qty = int(m.group("qty"))
+        if qty > 0:
             # Sanitize card name
-            name = text_validator.sanitize_card_name(name)
-            entry = CardEntry(qty=qty, name=name)
-            
-            if section == "main":
-                main_entries.append(entry)
-            else:
-                side_entries.append(entry)
+            name = text_validator.sanitize_card_name(m.group("name"))
+            section.append(CardEntry(qty=qty, name=name))
     
     return DeckSections(main=main_entries, side=side_entries)
 
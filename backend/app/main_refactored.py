@@ -28,8 +28,9 @@ from .models import (
     DeckSections, CardEntry, NormalizedDeck
 )
 from .error_taxonomy import *
-from .pipeline.preprocess import preprocess_variants
-from .pipeline.ocr import run_easyocr_best_of, run_vision_fallback
+from .pipeline.preprocess import most_ink, preprocess_variants
+from .pipeline.ocr import run_easyocr_best_of, run_vision_fallback, start_reader_warmup
+from .pipeline.lines import DECK_LINE_RX, should_use_fallback
 from .matching.fuzzy import score_candidates
 from .matching.scryfall_cache import scryfall_cache
 from .matching.scryfall_client import SCRYFALL
@@ -48,6 +49,12 @@ async def lifespan(app: FastAPI):
     # Connect to Redis for job storage
     await job_storage.connect()
     
+    # Load the OCR reader in the background (not at import: see pipeline.ocr)
+    start_reader_warmup()
+    
+    # Prime the metrics gauges so the first scrape isn't stale
+    await metrics.start_metrics_sampler()
+    
     # Initialize Scryfall cache
     logger.info("Initializing Scryfall cache...")
     # scryfall_cache is already initialized
@@ -242,15 +249,8 @@ async def process_ocr(content: bytes, job_id: str, trace_id: str) -> DeckResult:
         await job_storage.update_job(job_id, progress=40)
         
         # Fallback to Vision if needed
-        import re
-        def count_qty_lines(spans):
-            rx = re.compile(r"^\s*(\d+|[1-9]\dx)\s+\S+")
-            return sum(1 for s in spans if rx.match(s["text"].strip().lower()))
-        
-        if (ocr_raw["mean_conf"] < settings.OCR_MIN_CONF or 
-            count_qty_lines(ocr_raw["spans"]) < settings.OCR_MIN_LINES) and \
-           settings.ENABLE_VISION_FALLBACK:
-            best_img = max(variants, key=lambda im: cv2.countNonZero(im))
+        if should_use_fallback(ocr_raw, settings):
+            best_img = most_ink(variants)
             ocr_raw = run_vision_fallback(best_img)
         
         await job_storage.update_job(job_id, progress=60)
@@ -290,38 +290,24 @@ def parse_deck_sections(spans: list[OCRSpan]) -> DeckSections:
     """
     main_entries: list[CardEntry] = []
     side_entries: list[CardEntry] = []
-    section = "main"
+    section = main_entries
     
     for span in spans:
-        line = span.text.strip()
-        
-        # Check for sideboard marker
-        if line.lower().startswith("sideboard") or line.lower().startswith("sb"):
-            section = "side"
+        # One match per line decides marker vs entry
+        m = DECK_LINE_RX.match(span.text)
+        if m is None:
             continue
         
-        # Parse quantity and name
-        qty = 0
-        name = ""
-        parts = line.split(" ", 1)
-        
-        if len(parts) == 2:
-            if parts[0].isdigit():
-                qty = int(parts[0])
-                name = parts[1]
-            elif parts[0].lower().endswith("x") and parts[0][:-1].isdigit():
-                qty = int(parts[0][:-1])
-                name = parts[1]
+        # Sideboard marker
+        if m.group("side") is not None:
+            section = side_entries
+            continue
         
-        if qty > 0 and name:
+        qty = int(m.group("qty"))
+        if qty > 0:
             # Sanitize card name
-            name = text_validator.sanitize_card_name(name)
-            entry = CardEntry(qty=qty, name=name)
-            
-            if section == "main":
-                main_entries.append(entry)
-            else:
-                side_entries.append(entry)
+            name = text_validator.sanitize_card_name(m.group("name"))
+            section.append(CardEntry(qty=qty, name=name))
     
     return DeckSections(main=main_entries, side=side_entries)
 
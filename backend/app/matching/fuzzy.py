@@ -1,16 +1,20 @@
 import unicodedata
 from functools import lru_cache
+import numpy as np
 from rapidfuzz import fuzz, process
 from metaphone import doublemetaphone
 
-@lru_cache(maxsize=1024)
-def normalize_name(s: str) -> str:
-    """Normalize card name for fuzzy matching (cached)."""
+def _normalize(s: str) -> str:
     s = s.strip().lower()
     s = "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
     s = " ".join(s.split())
     return s
 
+@lru_cache(maxsize=1024)
+def normalize_name(s: str) -> str:
+    """Normalize card name for fuzzy matching (cached)."""
+    return _normalize(s)
+
 @lru_cache(maxsize=256)
 def get_metaphone(s: str) -> str:
     """Get metaphone encoding (cached)."""
@@ -32,7 +36,8 @@ def score_candidates(name: str, corpus: list[str], limit: int = 5):
     n = normalize_name(name)
     dm_n = get_metaphone(n)
     
-    def scorer(candidate):
+    def scorer(_query, candidate, **_):
+        # rapidfuzz calls scorer(query, choice, **kwargs); the query is prenormalized above
         dn = normalize_name(candidate)
         jw = fuzz.WRatio(n, dn)
         lvs = fuzz.token_sort_ratio(n, dn)
@@ -41,4 +46,45 @@ def score_candidates(name: str, corpus: list[str], limit: int = 5):
         return 0.6*jw + 0.35*lvs + 0.05*ph
     
     best = process.extract(name, corpus, scorer=scorer, limit=limit)
-    return [(cand, float(score)) for cand, score, _ in best]
\ No newline at end of file
+    return [(cand, float(score)) for cand, score, _ in best]
+
+def build_index(corpus: list[str]):
+    """Precompute normalized names and metaphone codes for score_candidates_batch.
+    
+    Uncached normalization: the whole corpus would only flush normalize_name's LRU.
+    """
+    norm = [_normalize(c) for c in corpus]
+    codes = np.array([doublemetaphone(n)[0] or "" for n in norm], dtype=object)
+    return norm, codes
+
+def score_candidates_batch(names: list[str], corpus: list[str], index, limit: int = 5):
+    """Score several names against the corpus in one vectorized pass.
+    
+    Same weighting as score_candidates, but the WRatio and token-sort
+    matrices come from rapidfuzz's C cdist instead of a per-pair Python scorer.
+    
+    Args:
+        names: Input card names to match
+        corpus: List of valid card names
+        index: Result of build_index(corpus)
+        limit: Maximum candidates per name
+        
+    Returns:
+        One list of (candidate_name, score) tuples per input name
+    """
+    norm, codes = index
+    if not names or not corpus:
+        return [[] for _ in names]
+    queries = [normalize_name(n) for n in names]
+    scores = 0.6 * process.cdist(queries, norm, scorer=fuzz.WRatio, dtype=np.float32, workers=-1)
+    scores += 0.35 * process.cdist(queries, norm, scorer=fuzz.token_sort_ratio, dtype=np.float32, workers=-1)
+    k = min(limit, len(corpus))
+    results = []
+    for row, q in zip(scores, queries):
+        dm = get_metaphone(q)
+        if dm:
+            row += 5.0 * (codes == dm)
+        top = np.argpartition(-row, k - 1)[:k]
+        top = top[np.argsort(-row[top], kind="stable")]
+        results.append([(corpus[j], float(row[j])) for j in top])
+    return results
@@ -24,6 +24,7 @@ class ScryfallCache:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.ttl = timedelta(days=ttl_days)
         self.session = None
+        self._has_cards: Optional[bool] = None
         self._init_db()
     
     def _init_db(self):
@@ -211,6 +212,7 @@ class ScryfallCache:
                 card_data.get('etag')
             ))
             conn.commit()
+            self._has_cards = True
             logger.info(f"Cached card: {card_data.get('name')}")
     
     async def fetch_card_online(self, name: str) -> Optional[Dict]:
@@ -290,6 +292,14 @@ class ScryfallCache:
         
         return card
     
+    def has_cards(self) -> bool:
+        """Cached check that the cache holds at least one card (readiness probes)"""
+        if self._has_cards is None:
+            with self._get_connection() as conn:
+                row = conn.execute("SELECT 1 FROM cards LIMIT 1").fetchone()
+            self._has_cards = row is not None
+        return self._has_cards
+    
     def get_stats(self) -> Dict:
         """Get cache statistics"""
         with self._get_connection() as conn:
@@ -322,6 +332,7 @@ class ScryfallCache:
                 WHERE datetime(updated_at, '+7 days') < datetime('now')
             """)
             conn.commit()
+            self._has_cards = None
             logger.info("Cleaned up expired cache entries")
     
     async def close(self):
@@ -1,7 +1,15 @@
-import json, os, sqlite3, time, requests, unicodedata
+import json, os, sqlite3, threading, time, requests, unicodedata
+from itertools import islice
+from pathlib import Path
 from typing import List, Dict, Optional
+import orjson
 from ..config import get_settings
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional streaming parser
+    ijson = None
+
 S = get_settings()
 
 SCHEMA = """
@@ -15,6 +23,14 @@ CREATE TABLE IF NOT EXISTS cards (
 CREATE INDEX IF NOT EXISTS idx_name ON cards(name);
 """
 
+def _iter_bulk(bulk_path):
+    """Cards of a Scryfall bulk file: streamed with ijson if installed, else one orjson parse."""
+    with open(bulk_path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, "item", use_float=True)
+        else:
+            yield from orjson.loads(f.read())
+
 def _fold(s: str) -> str:
     s = unicodedata.normalize("NFKD", s)
     s = "".join(c for c in s if not unicodedata.combining(c))
@@ -27,53 +43,129 @@ class Scryfall:
         with sqlite3.connect(self.db_path) as con:
             con.executescript(SCHEMA)
         self._last_call = 0.0
+        self._rate_lock = threading.Lock()
+        # Caps in-flight online calls; _rate() spaces their starts
+        self._online_sem = threading.BoundedSemaphore(S.SCRYFALL_CONCURRENCY)
         self._session = requests.Session()
+        self._ro_con: Optional[sqlite3.Connection] = None
+        self._ro_lock = threading.Lock()
+        # SQLite connections must not be used across fork() (Celery prefork
+        # children): a child reopens its own on first use
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forget_ro)
+
+    def _forget_ro(self):
+        self._ro_con = None
+        self._ro_lock = threading.Lock()
+
+    def _ro(self) -> sqlite3.Connection:
+        # Shared read-only connection: opened once instead of per lookup.
+        # Not immutable=1: hydrate_from_bulk rewrites the table in place.
+        if self._ro_con is None:
+            con = sqlite3.connect(Path(self.db_path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+            con.execute("PRAGMA query_only=1")
+            con.execute("PRAGMA mmap_size=268435456")
+            con.create_function("LOWER", 1, lambda x: x.lower() if isinstance(x,str) else x)
+            self._ro_con = con
+        return self._ro_con
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._ro_lock:
+            try:
+                return self._ro().execute(sql, params).fetchall()
+            except sqlite3.ProgrammingError:
+                # Connection closed underneath us: reopen once
+                self._ro_con = None
+                return self._ro().execute(sql, params).fetchall()
 
     # ----- OFFLINE -----
     def hydrate_from_bulk(self, bulk_path=S.SCRYFALL_BULK_PATH):
         if not os.path.exists(bulk_path): raise FileNotFoundError(bulk_path)
-        with open(bulk_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        rows = (
+            (card.get("id"), card.get("name"), card.get("lang","en"),
+             ",".join([f.get("name","") for f in card.get("card_faces",[])]),
+             orjson.dumps(card).decode())
+            for card in _iter_bulk(bulk_path)
+        )
         with sqlite3.connect(self.db_path) as con:
             cur = con.cursor(); cur.execute("DELETE FROM cards")
-            for card in data:
-                faces = ",".join([f.get("name","") for f in card.get("card_faces",[])])
-                cur.execute("INSERT OR REPLACE INTO cards(id,name,lang,faces,data) VALUES(?,?,?,?,?)",
-                            (card.get("id"), card.get("name"), card.get("lang","en"), faces, json.dumps(card)))
+            # Parsed cards go straight to SQLite, 10k rows per executemany
+            while batch := list(islice(rows, 10000)):
+                cur.executemany("INSERT OR REPLACE INTO cards(id,name,lang,faces,data) VALUES(?,?,?,?,?)", batch)
+            # Bumped in the same transaction, so readers in other processes
+            # never see new rows under the old generation
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            cur.execute(f"PRAGMA user_version={int(version) + 1}")
             con.commit()
 
+    @property
+    def generation(self) -> int:
+        """Version of the offline DB, bumped by every rehydrate.
+
+        Stored in the DB itself (PRAGMA user_version), so API and worker
+        processes see a rehydrate done by scripts/download_scryfall.py and
+        can drop name lists and memoized answers they derived.
+        """
+        return self._query("PRAGMA user_version")[0][0]
+
     def all_names(self) -> List[str]:
-        with sqlite3.connect(self.db_path) as con:
-            cur = con.cursor(); cur.execute("SELECT name FROM cards WHERE lang='en'")
-            return [r[0] for r in cur.fetchall()]
+        return [r[0] for r in self._query("SELECT name FROM cards WHERE lang='en'")]
 
     def lookup_exact_ci(self, name: str) -> List[Dict]:
-        with sqlite3.connect(self.db_path) as con:
-            con.create_function("LOWER", 1, lambda x: x.lower() if isinstance(x,str) else x)
-            cur = con.cursor(); cur.execute("SELECT data FROM cards WHERE LOWER(name)=LOWER(?)", (name,))
-            return [json.loads(r[0]) for r in cur.fetchall()]
+        rows = self._query("SELECT data FROM cards WHERE LOWER(name)=LOWER(?)", (name,))
+        return [json.loads(r[0]) for r in rows]
 
     def lookup_by_name(self, name: str) -> List[Dict]:
-        with sqlite3.connect(self.db_path) as con:
-            cur = con.cursor(); cur.execute("SELECT data FROM cards WHERE name=?", (name,))
-            return [json.loads(r[0]) for r in cur.fetchall()]
+        rows = self._query("SELECT data FROM cards WHERE name=?", (name,))
+        return [json.loads(r[0]) for r in rows]
+
+    def lookup_by_names(self, names: List[str]) -> Dict[str, Dict]:
+        """Batch lookup_by_name: first matching card per name, one query per 500 names."""
+        found: Dict[str, Dict] = {}
+        uniq = list(dict.fromkeys(names))
+        for i in range(0, len(uniq), 500):
+            chunk = uniq[i:i+500]
+            rows = self._query(f"SELECT name, data FROM cards WHERE name IN ({','.join('?'*len(chunk))})", tuple(chunk))
+            for name, data in rows:
+                if name not in found:
+                    found[name] = json.loads(data)
+        return found
 
     # ----- ONLINE -----
     def _rate(self):
-        delta = (time.monotonic() - self._last_call) * 1000.0
-        wait_ms = max(0.0, S.SCRYFALL_API_RATE_LIMIT_MS - delta)
-        if wait_ms > 0: time.sleep(wait_ms/1000.0)
+        # Reserve the next slot under the lock so concurrent callers stay spaced out
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._last_call + S.SCRYFALL_API_RATE_LIMIT_MS/1000.0)
+            self._last_call = start
+        if start > now: time.sleep(start - now)
 
     def _get(self, url: str, params: dict) -> Optional[dict]:
+        return self._request("GET", url, params=params)
+
+    def _post(self, url: str, payload: dict) -> Optional[dict]:
+        return self._request("POST", url, json=payload)
+
+    def _request(self, method: str, url: str, **kwargs) -> Optional[dict]:
         if not S.ENABLE_SCRYFALL_ONLINE_FALLBACK: return None
-        try:
-            self._rate()
-            r = self._session.get(url, params=params, timeout=S.SCRYFALL_API_TIMEOUT)
-            self._last_call = time.monotonic()
-            if r.status_code != 200: return None
-            return r.json()
-        except Exception:
-            return None
+        with self._online_sem:
+            for attempt in range(S.SCRYFALL_MAX_RETRIES):
+                try:
+                    self._rate()
+                    r = self._session.request(method, url, timeout=S.SCRYFALL_API_TIMEOUT, **kwargs)
+                except Exception:
+                    return None
+                if r.status_code == 200:
+                    try: return r.json()
+                    except ValueError: return None
+                if r.status_code not in (429, 503): return None
+                # Out of retries: give the slot back now rather than sleep for nothing
+                if attempt == S.SCRYFALL_MAX_RETRIES - 1: return None
+                # Throttled: honour Retry-After, else back off exponentially (1s, 2s, 4s...)
+                try: delay = float(r.headers.get("Retry-After", ""))
+                except ValueError: delay = 2.0 ** attempt
+                time.sleep(min(delay, 30.0))
+        return None
 
     def online_named_fuzzy(self, name: str) -> Optional[Dict]:
         return self._get("https://api.scryfall.com/cards/named", {"fuzzy": name})
@@ -83,6 +175,49 @@ class Scryfall:
         if not j: return []
         return j.get("data", [])[:limit]
 
+    def online_collection(self, names: List[str]) -> Dict[str, Dict]:
+        """Exact-name lookup of up to 75 names per POST /cards/collection."""
+        found: Dict[str, Dict] = {}
+        for i in range(0, len(names), 75):
+            chunk = names[i:i+75]
+            j = self._post("https://api.scryfall.com/cards/collection",
+                           {"identifiers": [{"name": n} for n in chunk]})
+            if not j: continue
+            # Identifiers match case-insensitively, and on either face of a DFC
+            by_name: Dict[str, Dict] = {}
+            for card in j.get("data", []):
+                for nm in [card.get("name", "")] + [f.get("name", "") for f in card.get("card_faces", [])]:
+                    by_name.setdefault(nm.lower(), card)
+            for n in chunk:
+                card = by_name.get(n.lower())
+                if card: found[n] = card
+        return found
+
+    # ----- Resolver batch (correspondances exactes) -----
+    def resolve_many(self, names: List[str]) -> Dict[str, Dict]:
+        """Batch the exact-match steps of resolve() for many names.
+
+        One offline scan covers every name, then one /cards/collection POST
+        per 75 names still unmatched. Names without an exact match are left
+        out; callers fall back to resolve() for those.
+        """
+        out: Dict[str, Dict] = {}
+        wanted: Dict[str, List[str]] = {}
+        for n in names: wanted.setdefault(n.lower(), []).append(n)
+        keys = list(wanted)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i+500]
+            rows = self._query(f"SELECT LOWER(name), data FROM cards WHERE LOWER(name) IN ({','.join('?'*len(chunk))})", tuple(chunk))
+            for low, data in rows:
+                for n in wanted.get(low, ()):
+                    if n not in out:
+                        card = json.loads(data)
+                        out[n] = {"name": card["name"], "id": card.get("id"), "source": "offline_exact", "candidates": []}
+        rest = [n for n in dict.fromkeys(names) if n not in out]
+        for n, card in self.online_collection(rest).items():
+            out[n] = {"name": card["name"], "id": card.get("id"), "source": "online_exact", "candidates": []}
+        return out
+
     # ----- Resolver (toujours appelée) -----
     def resolve(self, raw_name: str, topk: int=5) -> Dict:
         # 1) Offline exact
@@ -0,0 +1,34 @@
+"""
+Deck-line patterns and the Vision fallback heuristic, shared by the API
+pipeline and the Celery task.
+"""
+
+import re
+from itertools import islice
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - optional linear-time regex engine
+    re2 = None
+
+# Run per OCR span: RE2 (DFA, no backtracking) when installed.
+# Card-entry line ("4 Island", "4x Island"), used by the fallback heuristic
+QTY_LINE_RX = (re2 or re).compile(r"^\s*(\d+|[1-9]\dx)\s+\S+")
+# Deck line: sideboard marker (prefix, checked first) or "4 Island" / "4x Island"
+DECK_LINE_RX = (re2 or re).compile(r"(?s)^\s*(?:(?P<side>(?i:sideboard|sb))|(?P<qty>\d+)[xX]? (?P<name>.*?\S)\s*$)")
+
+def count_qty_lines(spans, limit: int) -> int:
+    """Card-entry spans, counted up to `limit` (only "fewer than limit?" matters)."""
+    hits = (s for s in spans if QTY_LINE_RX.match(s["text"].lower()))
+    return sum(1 for _ in islice(hits, limit))
+
+def should_use_fallback(ocr_raw, settings) -> bool:
+    """Whether an EasyOCR result is weak enough to retry with Vision.
+    
+    Cheapest checks first: no span scan at all when the fallback is off or
+    confidence is already too low.
+    """
+    return settings.ENABLE_VISION_FALLBACK and (
+        ocr_raw["mean_conf"] < settings.OCR_MIN_CONF
+        or count_qty_lines(ocr_raw["spans"], settings.OCR_MIN_LINES) < settings.OCR_MIN_LINES
+    )
@@ -1,5 +1,76 @@
 import cv2, numpy as np
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _TJ = TurboJPEG()
+except Exception:  # pragma: no cover - package or libturbojpeg missing
+    _TJ = None
+
+_JPEG_MAGIC = b"\xff\xd8\xff"
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+# preprocess() never works below this height; sources twice as tall decode at half size
+_PREPROCESS_HEIGHT = 1500
+
+def _source_height(data: bytes) -> int:
+    """Pixel height from the PNG IHDR or JPEG SOFn header, 0 if unknown."""
+    if data[:8] == _PNG_MAGIC and len(data) >= 24:
+        return int.from_bytes(data[20:24], "big")
+    if data[:3] == _JPEG_MAGIC:
+        i = 2
+        while i + 9 < len(data) and data[i] == 0xFF:
+            marker = data[i + 1]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                return int.from_bytes(data[i + 5:i + 7], "big")
+            i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return 0
+
+def _exif_orientation(data: bytes) -> int:
+    """EXIF Orientation tag (1-8) of a JPEG's APP1 segment, 1 if absent or unreadable."""
+    if data[:3] != _JPEG_MAGIC:
+        return 1
+    i = 2
+    while i + 4 <= len(data) and data[i] == 0xFF:
+        marker = data[i + 1]
+        if marker == 0xDA:  # start of scan: no more metadata
+            break
+        seg_len = int.from_bytes(data[i + 2:i + 4], "big")
+        if marker == 0xE1 and data[i + 4:i + 10] == b"Exif\0\0":
+            tiff = data[i + 10:i + 2 + seg_len]
+            order = {b"II": "little", b"MM": "big"}.get(tiff[:2])
+            if order is None or len(tiff) < 10:
+                return 1
+            ifd = int.from_bytes(tiff[4:8], order)
+            count = int.from_bytes(tiff[ifd:ifd + 2], order)
+            for e in range(ifd + 2, ifd + 2 + 12 * count, 12):
+                if int.from_bytes(tiff[e:e + 2], order) == 0x0112:
+                    value = int.from_bytes(tiff[e + 8:e + 10], order)
+                    return value if 1 <= value <= 8 else 1
+            return 1
+        i += 2 + seg_len
+    return 1
+
+def decode_image(data: bytes):
+    """Decode an upload to an upright BGR array (None if undecodable), via
+    libjpeg-turbo for JPEGs without an EXIF rotation when available.
+    
+    Sources at least twice preprocess's working height are decoded at
+    half size (DCT scaling for JPEG), so still at or above that height.
+    This is not lossless for preprocess: its kernels are fixed pixel sizes
+    (threshold blocks 31/25, NLM window 21, 2x2 close), so the binarized
+    variants of a reduced source differ from a full-size decode.
+    np.frombuffer is a view: callers must not mutate `data` meanwhile.
+    """
+    reduce = _source_height(data) >= 2 * _PREPROCESS_HEIGHT
+    # TurboJPEG ignores EXIF Orientation, OpenCV applies it: rotated phone
+    # shots go through OpenCV so they reach OCR upright
+    if _TJ is not None and data[:3] == _JPEG_MAGIC and _exif_orientation(data) == 1:
+        try:
+            return _TJ.decode(data, pixel_format=TJPF_BGR, scaling_factor=(1, 2) if reduce else None)
+        except Exception:
+            pass  # Corrupt or exotic JPEG: let OpenCV have a go
+    flags = cv2.IMREAD_REDUCED_COLOR_2 if reduce else cv2.IMREAD_COLOR
+    return cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+
 def _unsharp_mask(img):
     blurred = cv2.GaussianBlur(img, (0,0), 1.0)
     return cv2.addWeighted(img, 1.5, blurred, -0.5, 0)
@@ -15,7 +86,7 @@ def _deskew(gray):
 
 def preprocess(bgr):
     h, w = bgr.shape[:2]
-    scale = 1500.0 / max(1.0, float(h))
+    scale = _PREPROCESS_HEIGHT / max(1.0, float(h))
     if scale < 1.0: scale = 1.0
     bgr = cv2.resize(bgr, (int(w*scale), int(h*scale)), interpolation=cv2.INTER_CUBIC)
     gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
@@ -25,18 +96,69 @@ def preprocess(bgr):
     th = _deskew(th)
     return th
 
-def preprocess_variants(bgr):
+def ink_score(img, factor=16):
+    """Non-zero pixel count of a factor× downsample, for ranking variants.
+    
+    Works on grayscale and colour arrays (a colour pixel counts if any channel is set).
+    """
+    h, w = img.shape[:2]
+    small = cv2.resize(img, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA)
+    return int(np.count_nonzero(small if small.ndim == 2 else small.any(axis=2)))
+
+def most_ink(variants):
+    """The variant with the highest ink_score (first on ties).
+    
+    Variants differ in size (the base one is upscaled), so they can't be
+    stacked; scores are collected into one array and argmax'd instead.
+    """
+    scores = np.fromiter((ink_score(v) for v in variants), dtype=np.int64, count=len(variants))
+    return variants[int(scores.argmax())]
+
+class VariantBuffers:
+    """Output arrays for the derived variants, reused while the image size repeats.
+    
+    Each call overwrites the previous call's variants and nothing is locked:
+    only for workers that run one job at a time (Celery prefork children).
+    """
+    def __init__(self):
+        self._bufs = {}
+    
+    def get(self, slot, like):
+        buf = self._bufs.get(slot)
+        if buf is None or buf.shape != like.shape or buf.dtype != like.dtype:
+            buf = self._bufs[slot] = np.empty_like(like)
+        return buf
+
+def iter_preprocess_variants(bgr, buffers=None):
+    """Yield the variants one at a time so callers can drop each after use.
+    
+    With `buffers` (a VariantBuffers), the derived variants are written into
+    its arrays instead of fresh allocations.
+    """
     base = preprocess(bgr)
-    variants = [base]
+    yield base
     # autre paramétrage
     gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
     gray = _unsharp_mask(gray)
     th2 = cv2.adaptiveThreshold(gray,255,cv2.ADAPTIVE_THRESH_GAUSSIAN_C,cv2.THRESH_BINARY,25,7)
-    th2 = _deskew(th2); variants.append(th2)
+    del gray
+    yield _deskew(th2)
+    del th2
     # fermeture morpho
     k = cv2.getStructuringElement(cv2.MORPH_RECT, (2,2))
-    close = cv2.morphologyEx(base, cv2.MORPH_CLOSE, k, iterations=1)
-    variants.append(close)
+    yield cv2.morphologyEx(base, cv2.MORPH_CLOSE, k, dst=buffers.get("close", base) if buffers else None, iterations=1)
     # inversion (thèmes sombres)
-    variants.append(cv2.bitwise_not(base))
-    return variants
\ No newline at end of file
+    yield cv2.bitwise_not(base, dst=buffers.get("invert", base) if buffers else None)
+
+def preprocess_variants(bgr, buffers=None):
+    return list(iter_preprocess_variants(bgr, buffers))
+
+def preprocess_bytes(data):
+    """Decode and build variants in one call, for a process pool.
+    
+    Only the upload is sent to the worker; the four full-size uint8 variants
+    come back pickled, so each call copies several MB between processes.
+    """
+    bgr = decode_image(data)
+    if bgr is None: return None
+    return preprocess_variants(bgr)
@@ -3,6 +3,7 @@ OpenAI Vision API fallback for OCR with configurable thresholds and metrics.
 """
 
 import base64
+import re
 import time
 from typing import Dict, Any, Optional
 import cv2
@@ -14,6 +15,10 @@ from ..core.config import settings
 from ..telemetry import logger, telemetry
 from ..routers.metrics import record_ocr_duration, record_error
 
+# Line of the Vision model's text answer, classified in one match:
+# a sideboard marker anywhere in the line (checked first) or "<qty>[x] <name>"
+_LINE_RX = re.compile(r'^(?:(?P<side>.*?sideboard)|(?P<qty>\d+)x?\s+(?P<name>.+)$)', re.IGNORECASE)
+
 class VisionFallback:
     """
     OpenAI Vision API fallback with thresholds and metrics.
@@ -201,20 +206,19 @@ class VisionFallback:
         current_section = main
         
         for line in lines:
-            line = line.strip()
+            match = _LINE_RX.match(line.strip())
+            if match is None:
+                continue
             
-            # Check for sideboard marker
-            if 'sideboard' in line.lower():
+            # Sideboard marker
+            if match.group("side") is not None:
                 current_section = side
                 continue
             
-            # Parse card line
-            import re
-            match = re.match(r'^(\d+)x?\s+(.+)$', line, re.IGNORECASE)
-            if match:
-                qty = int(match.group(1))
-                name = match.group(2).strip()
-                current_section.append({"qty": qty, "name": name})
+            # Card line
+            qty = int(match.group("qty"))
+            name = match.group("name").strip()
+            current_section.append({"qty": qty, "name": name})
         
         return {
             "main": main,
@@ -3,73 +3,129 @@ Export endpoints for Screen2Deck API.
 """
 
 from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.responses import PlainTextResponse, JSONResponse
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import PlainTextResponse, StreamingResponse, ORJSONResponse
+from typing import Iterator, Optional, List, Literal, cast
+import msgspec
 
 from ..models import NormalizedDeck, NormalizedCard
-from ..exporters.mtga import export_mtga
+from ..exporters.mtga import export_mtga_iter
 from ..exporters.moxfield import export_moxfield
 from ..exporters.archidekt import export_archidekt
 from ..exporters.tappedout import export_tappedout
 from ..telemetry import logger, telemetry
 from ..core.rate_limit import export_rate_limiter
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Validated by FastAPI while parsing the path: unknown formats get a 422
+ExportFormat = Literal["mtga", "moxfield", "archidekt", "tappedout"]
+
+# Text exporters; mtga is streamed separately via export_mtga_iter
+EXPORTERS = {
+    "moxfield": export_moxfield,
+    "archidekt": export_archidekt,
+    "tappedout": export_tappedout,
+}
 
 async def check_rate_limit(request: Request):
     """Dependency to check rate limit for export endpoints."""
-    rate_limit_response = await export_rate_limiter.check_request(request)
-    if rate_limit_response:
+    exceeded = await export_rate_limiter.check_request(request)
+    if exceeded is not None:
         raise HTTPException(
             status_code=429,
-            detail=rate_limit_response.body.decode() if hasattr(rate_limit_response, 'body') else "Rate limit exceeded"
+            detail=exceeded.message,
+            headers=exceeded.headers
         )
 
-class CardIn(BaseModel):
+class CardIn(msgspec.Struct, frozen=True):
     qty: int
     name: str
     scryfall_id: Optional[str] = None
 
-class ExportPayload(BaseModel):
+class ExportPayload(msgspec.Struct, frozen=True):
     main: List[CardIn]
     side: List[CardIn] = []
 
-def _to_normalized(payload: ExportPayload) -> NormalizedDeck:
-    main = [NormalizedCard(qty=c.qty, name=c.name, scryfall_id=c.scryfall_id) for c in payload.main]
-    side = [NormalizedCard(qty=c.qty, name=c.name, scryfall_id=c.scryfall_id) for c in payload.side]
-    return NormalizedDeck(main=main, side=side)
+# Built once: schema-guided decoder that parses and validates in one pass.
+# strict=False keeps the lax coercion the pydantic body had (e.g. "qty": "4")
+_DECODER = msgspec.json.Decoder(ExportPayload, strict=False)
+
+def _inline_schema(tp) -> dict:
+    """JSON schema for a msgspec type with $refs inlined (for openapi_extra,
+    which can't register components)."""
+    (root,), defs = msgspec.json.schema_components([tp], ref_template="{name}")
+
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(defs[node["$ref"]])
+            return {k: resolve(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+
+    return resolve(root)
+
+# The body is read by msgspec_body, so FastAPI can't infer it: document it here
+_EXPORT_BODY_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": _inline_schema(ExportPayload)}},
+    }
+}
+
+async def msgspec_body(request: Request) -> ExportPayload:
+    """Dependency decoding the export request body with msgspec."""
+    try:
+        return _DECODER.decode(await request.body())
+    except msgspec.ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except msgspec.DecodeError:
+        raise HTTPException(status_code=422, detail="Invalid JSON body")
+
+def _traced_stream(chunks: Iterator[bytes], format: str) -> Iterator[bytes]:
+    """Wrap a streamed export in its span, so the span covers the body
+    generation and ends when the stream does (or the client disconnects)."""
+    with telemetry.span("export_deck"):
+        try:
+            yield from chunks
+        except Exception as e:
+            # Headers are already sent: nothing to turn into a 500, just record it
+            telemetry.record_exception(e, {"format": format})
+            logger.exception("export_failed")
+            raise
 
 @router.post(
     "/{format}",
     response_class=PlainTextResponse,
     summary="Export deck to format",
     description="Export a normalized deck to specified format (unauthenticated for CI golden tests, rate limited to 20 req/min/IP)",
-    dependencies=[Depends(check_rate_limit)]
+    dependencies=[Depends(check_rate_limit)],
+    openapi_extra=_EXPORT_BODY_OPENAPI,
 )
-async def export_deck(format: str, payload: ExportPayload, request: Request):
+async def export_deck(format: ExportFormat, request: Request, payload: ExportPayload = Depends(msgspec_body)):
     """
     Export a deck to the specified format.
     """
-    # Simple format validation
-    valid_formats = ["mtga", "moxfield", "archidekt", "tappedout"]
-    if format not in valid_formats:
-        raise HTTPException(status_code=400, detail="Invalid export format")
+    # CardIn exposes the same qty/name/scryfall_id fields the exporters read,
+    # and the payload is already validated: wrap it without rebuilding cards
+    deck = NormalizedDeck.model_construct(
+        main=cast(List[NormalizedCard], payload.main),
+        side=cast(List[NormalizedCard], payload.side)
+    )
     
-    deck = _to_normalized(payload)
+    if format == "mtga":
+        # Stream line by line: no full-deck string held in memory. The body is
+        # generated after this returns, so the span lives in the iterator
+        return StreamingResponse(
+            _traced_stream(export_mtga_iter(deck), format),
+            media_type="text/plain; charset=utf-8",
+            headers=getattr(request.state, "rate_limit_headers", None)
+        )
     
     with telemetry.span("export_deck") as span:
         try:
-            if format == "mtga":
-                content = export_mtga(deck)
-            elif format == "moxfield":
-                content = export_moxfield(deck)
-            elif format == "archidekt":
-                content = export_archidekt(deck)
-            elif format == "tappedout":
-                content = export_tappedout(deck)
-            else:
-                raise HTTPException(status_code=400, detail="Unknown export format")
+            content = EXPORTERS[format](deck)
             
             # Create response with rate limit headers
             response = PlainTextResponse(content=content)
@@ -88,6 +144,42 @@ async def export_deck(format: str, payload: ExportPayload, request: Request):
             raise HTTPException(status_code=500, detail="export_failed")
 
 
+_FORMATS = {
+    "formats": [
+        {
+            "id": "mtga",
+            "name": "MTG Arena",
+            "description": "MTG Arena deck format",
+            "example": "4 Lightning Bolt (2XM) 129"
+        },
+        {
+            "id": "moxfield",
+            "name": "Moxfield",
+            "description": "Moxfield deck format",
+            "example": "4 Lightning Bolt"
+        },
+        {
+            "id": "archidekt",
+            "name": "Archidekt",
+            "description": "Archidekt deck format",
+            "example": "// Main\\n4 Lightning Bolt"
+        },
+        {
+            "id": "tappedout",
+            "name": "TappedOut",
+            "description": "TappedOut deck format",
+            "example": "4x Lightning Bolt"
+        },
+        {
+            "id": "json",
+            "name": "JSON",
+            "description": "Raw JSON format",
+            "example": '{"main": [...], "side": [...]}'
+        }
+    ]
+}
+
+
 @router.get(
     "/formats",
     summary="List export formats",
@@ -97,40 +189,4 @@ async def list_formats():
     """
     List all supported export formats.
     """
-    return {
-        "formats": [
-            {
-                "id": "mtga",
-                "name": "MTG Arena",
-                "description": "MTG Arena deck format",
-                "example": "4 Lightning Bolt (2XM) 129"
-            },
-            {
-                "id": "moxfield",
-                "name": "Moxfield",
-                "description": "Moxfield deck format",
-                "example": "4 Lightning Bolt"
-            },
-            {
-                "id": "archidekt",
-                "name": "Archidekt",
-                "description": "Archidekt deck format",
-                "example": "// Main\\n4 Lightning Bolt"
-            },
-            {
-                "id": "tappedout",
-                "name": "TappedOut",
-                "description": "TappedOut deck format",
-                "example": "4x Lightning Bolt"
-            },
-            {
-                "id": "json",
-                "name": "JSON",
-                "description": "Raw JSON format",
-                "example": '{"main": [...], "side": [...]}'
-            }
-        ]
-    }
-
-
-from pydantic import BaseModel
\ No newline at end of file
+    return _FORMATS
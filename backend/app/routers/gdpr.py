@@ -4,16 +4,25 @@ GDPR compliance endpoints for data access and deletion.
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import Dict, Any
+from datetime import datetime
 import hashlib
+import re
 
 from ..core.config import settings
 from ..core.job_storage import job_storage
+from ..cache_manager import cache_manager
 from ..core.metrics import gdpr_requests_total, retention_deleted_total
 from ..telemetry import logger
 from ..auth import get_current_user, require_permission
 
 router = APIRouter(prefix="/api/gdpr", tags=["GDPR"])
 
+# Identifier formats accepted by delete_data
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+# Image hash: SHA-256 hex, or the BLAKE3 cache form "b3:<hex>" (see
+# OCRService._digest); a bare 64-hex value may be either algorithm
+_IMAGE_HASH_RE = re.compile(r"^(?:b3:)?([0-9a-f]{64})$", re.I)
+
 
 @router.delete(
     "/data/{identifier}",
@@ -26,6 +35,15 @@ async def delete_data(identifier: str) -> Dict[str, Any]:
     Delete data associated with a job ID or image hash.
     Implements GDPR Article 17 - Right to erasure.
     """
+    # Reject malformed identifiers before touching storage
+    is_job_id = _UUID_RE.match(identifier) is not None
+    hash_match = None if is_job_id else _IMAGE_HASH_RE.match(identifier)
+    if not is_job_id and hash_match is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid identifier format. Use job ID (UUID) or image hash (SHA256, or b3:<BLAKE3>)"
+        )
+    
     try:
         deleted_items = {
             "job": False,
@@ -34,8 +52,7 @@ async def delete_data(identifier: str) -> Dict[str, Any]:
             "hash": False
         }
         
-        # Check if it's a job ID (UUID format)
-        if "-" in identifier and len(identifier) == 36:
+        if is_job_id:
             # Delete job data
             job_deleted = await job_storage.delete_job(identifier)
             if job_deleted:
@@ -44,28 +61,22 @@ async def delete_data(identifier: str) -> Dict[str, Any]:
                 retention_deleted_total.labels(type='jobs', reason='gdpr_request').inc()
                 logger.info(f"GDPR deletion: Job {identifier} deleted")
         
-        # Check if it's an image hash (SHA256)
-        elif len(identifier) == 64:
-            # Delete hash-related data
-            from ..cache import redis_client
-            
-            # Delete from Redis
+        else:
+            # Delete hash-related data from Redis; matching on the bare hex
+            # covers both key forms ("ocr:<hex>" and "ocr:b3:<hex>")
+            hex_digest = hash_match.group(1).lower()
+            redis_client = cache_manager.redis_client
             keys_deleted = 0
-            for key in redis_client.scan_iter(match=f"*{identifier}*"):
-                redis_client.delete(key)
-                keys_deleted += 1
+            if redis_client is not None:
+                for key in redis_client.scan_iter(match=f"*{hex_digest}*"):
+                    redis_client.delete(key)
+                    keys_deleted += 1
             
             if keys_deleted > 0:
                 deleted_items["hash"] = True
                 retention_deleted_total.labels(type='hashes', reason='gdpr_request').inc()
                 logger.info(f"GDPR deletion: {keys_deleted} keys for hash {identifier} deleted")
         
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid identifier format. Use job ID (UUID) or image hash (SHA256)"
-            )
-        
         # Track GDPR request
         gdpr_requests_total.labels(
             type='delete',
@@ -91,8 +102,7 @@ async def delete_data(identifier: str) -> Dict[str, Any]:
 @router.get(
     "/data/export/{user_id}",
     summary="Export user data",
-    description="Exercise GDPR right to data portability (Article 20)",
-    dependencies=[Depends(get_current_user)]
+    description="Exercise GDPR right to data portability (Article 20)"
 )
 async def export_user_data(user_id: str, current_user: dict = Depends(get_current_user)) -> Dict[str, Any]:
     """
@@ -116,7 +126,7 @@ async def export_user_data(user_id: str, current_user: dict = Depends(get_curren
             "exports": []
         }
         
-        # Get job history
+        # Get job history (one MGET over the user's job index)
         jobs = await job_storage.get_user_jobs(user_id)
         user_data["jobs"] = jobs
         
@@ -2,17 +2,41 @@
 Health check endpoints for Screen2Deck API.
 """
 
-from fastapi import APIRouter, status, Request, HTTPException, Depends
+from fastapi import APIRouter, status, Request, HTTPException, Depends, Response
 from typing import Dict, Any, Optional
+import asyncio
+import numpy as np
+import orjson
 import psutil
 import time
 
 from ..core.config import settings
 from ..core.job_storage import job_storage
+from ..matching.scryfall_cache import scryfall_cache
+from ..pipeline.ocr import reader_status, run_easyocr
 from ..telemetry import logger
 
 router = APIRouter()
 
+# Settings are immutable per process: parse the allowlist once
+_ALLOWED_IPS = frozenset(ip.strip() for ip in settings.HEALTH_ALLOWED_IPS.split(",") if ip.strip())
+
+# Aggregated readiness payload, reused for _CHECK_TTL seconds across probes
+_CHECK_TTL = 3.0
+_last_check: tuple[float, Dict[str, Any]] = (0.0, {})
+
+# Startup probe: one real OCR pass, then answered from memory
+_PROBE_IMAGE = np.zeros((32, 128), dtype=np.uint8)
+_startup_verified = False
+
+# Static production answer of /health/detailed, serialized once
+_MINIMAL_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "version": "2.0.0",
+    "environment": settings.APP_ENV,
+    "message": "Detailed metrics restricted"
+})
+
 
 def check_health_access(request: Request) -> bool:
     """Check if client is allowed to access detailed health endpoint."""
@@ -22,9 +46,7 @@ def check_health_access(request: Request) -> bool:
     
     # Check IP allowlist
     client_ip = request.client.host
-    allowed_ips = [ip.strip() for ip in settings.HEALTH_ALLOWED_IPS.split(",")]
-    
-    if client_ip not in allowed_ips:
+    if client_ip not in _ALLOWED_IPS:
         logger.warning(f"Unauthorized health access attempt from {client_ip}")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -71,53 +93,89 @@ async def liveness() -> Dict[str, str]:
     summary="Readiness probe",
     description="Kubernetes readiness probe endpoint"
 )
-async def readiness() -> Dict[str, Any]:
+async def readiness(http_response: Response, deep: bool = False) -> Dict[str, Any]:
     """
     Readiness probe for Kubernetes.
-    Checks if all dependencies are ready.
+    Checks if the hard dependencies (Redis, OCR reader) are ready; answers
+    503 when any is not. Scryfall cache and system load are reported only.
+    Only cheap checks run here (the OCR pipeline is exercised by /health/startup).
+    Results are cached for a few seconds; pass ?deep=true to force a fresh check.
     """
+    global _last_check
+    checked_at, cached = _last_check
+    if not deep and checked_at and time.monotonic() - checked_at < _CHECK_TTL:
+        if cached["status"] != "ready":
+            http_response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return cached
+    
+    # Hard dependencies: any of these down answers 503
     checks = {
         "redis": False,
-        "scryfall": False,
-        "system": False
+        "ocr": False
     }
     
-    # Check Redis connection
-    try:
-        await job_storage.connect()
-        stats = await job_storage.get_stats()
-        checks["redis"] = True
-    except Exception as e:
-        logger.error(f"Redis health check failed: {e}")
+    # Check Redis connection (cached flag, refreshed in the background)
+    checks["redis"] = await job_storage.healthy()
     
-    # Check Scryfall cache
+    # Check EasyOCR reader (loaded in the background at startup)
+    checks["ocr"] = reader_status() == "ready"
+    
+    # Informational only: the Scryfall cache fills from traffic (a fresh pod
+    # starts empty) and load is expected to run high under OCR work
+    info: Dict[str, Any] = {}
     try:
-        from ..matching.scryfall_cache import scryfall_cache
-        cache_stats = scryfall_cache.get_stats()
-        checks["scryfall"] = cache_stats["total_cards"] > 0
+        info["scryfall_cache_warm"] = scryfall_cache.has_cards()
     except Exception as e:
         logger.error(f"Scryfall health check failed: {e}")
     
-    # Check system resources
     try:
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        memory = psutil.virtual_memory()
-        checks["system"] = cpu_percent < 90 and memory.percent < 90
+        # Load average has no shared baseline, unlike cpu_percent(interval=None)
+        info["load_per_cpu"] = round(psutil.getloadavg()[0] / (psutil.cpu_count() or 1), 2)
+        info["memory_percent"] = psutil.virtual_memory().percent
     except Exception as e:
         logger.error(f"System health check failed: {e}")
     
     # Determine overall readiness
     all_ready = all(checks.values())
     
-    response = {
+    payload = {
         "status": "ready" if all_ready else "not_ready",
-        "checks": checks
+        "checks": checks,
+        "info": info
     }
+    _last_check = (time.monotonic(), payload)
     
     if not all_ready:
-        return response  # Still return 200 for K8s compatibility
+        http_response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    return payload
+
+
+@router.get(
+    "/health/startup",
+    status_code=status.HTTP_200_OK,
+    summary="Startup probe",
+    description="Kubernetes startup probe endpoint"
+)
+async def startup(response: Response) -> Dict[str, Any]:
+    """
+    Startup probe for Kubernetes.
+    Runs one real OCR pass once the reader has loaded; after the first
+    success it answers from memory for the rest of the process lifetime.
+    """
+    global _startup_verified
+    if not _startup_verified and reader_status() == "ready":
+        try:
+            await asyncio.to_thread(run_easyocr, _PROBE_IMAGE)
+            _startup_verified = True
+        except Exception as e:
+            logger.error(f"Startup OCR check failed: {e}")
+    
+    if not _startup_verified:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting", "ocr": reader_status()}
     
-    return response
+    return {"status": "started"}
 
 
 @router.get(
@@ -127,7 +185,7 @@ async def readiness() -> Dict[str, Any]:
     description="Detailed health information including metrics",
     dependencies=[Depends(check_health_access)]
 )
-async def detailed_health(request: Request) -> Dict[str, Any]:
+async def detailed_health(request: Request):
     """
     Detailed health check with system metrics.
     Protected endpoint - requires IP allowlist or dev mode.
@@ -136,12 +194,7 @@ async def detailed_health(request: Request) -> Dict[str, Any]:
     # Sanitize response based on HEALTH_EXPOSE_INTERNAL flag
     if not settings.HEALTH_EXPOSE_INTERNAL:
         # Return minimal info in production
-        return {
-            "status": "healthy",
-            "version": "2.0.0",
-            "environment": settings.APP_ENV,
-            "message": "Detailed metrics restricted"
-        }
+        return Response(_MINIMAL_HEALTH_BYTES, media_type="application/json")
     # System metrics
     cpu_percent = psutil.cpu_percent(interval=0.1)
     memory = psutil.virtual_memory()
@@ -157,7 +210,6 @@ async def detailed_health(request: Request) -> Dict[str, Any]:
     # Scryfall cache stats
     cache_stats = {}
     try:
-        from ..matching.scryfall_cache import scryfall_cache
         cache_stats = scryfall_cache.get_stats()
     except Exception as e:
         logger.error(f"Failed to get cache stats: {e}")
@@ -7,11 +7,20 @@ from prometheus_client import (
     Counter, Histogram, Gauge, Info,
     generate_latest, CONTENT_TYPE_LATEST
 )
+from typing import Optional
+import asyncio
 import time
 import psutil
 
+from ..core.job_storage import job_storage
+from ..telemetry import logger
+
 router = APIRouter()
 
+# System gauges are sampled in the background, independent of scrape rate
+SAMPLE_INTERVAL_SECONDS = 5.0
+_sampler_task: Optional[asyncio.Task] = None
+
 # Define Prometheus metrics
 ocr_requests = Counter(
     "screen2deck_ocr_requests_total",
@@ -72,6 +81,58 @@ app_info.info({
 })
 
 
+def _sample_system_metrics():
+    """Refresh system gauges (non-blocking: cpu_percent uses deltas between calls)."""
+    cpu_usage.set(psutil.cpu_percent(interval=None))
+    memory_usage.set(psutil.virtual_memory().used)
+
+
+async def _sample_job_metrics():
+    """Refresh job gauges from the Redis counter that API and Celery writers
+    bump on entering/leaving "processing" (one GET, no scan)."""
+    active_jobs.set(await job_storage.processing_count())
+
+
+async def _system_metrics_loop():
+    """Sample system and job metrics every SAMPLE_INTERVAL_SECONDS until cancelled."""
+    while True:
+        await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+        try:
+            _sample_system_metrics()
+        except Exception as e:
+            logger.error(f"System metrics sampling failed: {e}")
+        try:
+            await _sample_job_metrics()
+        except Exception as e:
+            logger.error(f"Job metrics sampling failed: {e}")
+
+
+async def start_metrics_sampler():
+    """
+    Prime the gauges and start the background sampler (idempotent).
+    
+    Called from the app lifespan so the first scrape already sees real
+    values. cpu_percent(interval=None) returns 0.0 on its first call (it
+    only records a baseline), so that call is made here, and the gauge gets
+    one short blocking reading off the event loop instead.
+    """
+    global _sampler_task
+    if _sampler_task is not None and not _sampler_task.done():
+        return
+    psutil.cpu_percent(interval=None)
+    try:
+        cpu_usage.set(await asyncio.to_thread(psutil.cpu_percent, 0.1))
+        memory_usage.set(psutil.virtual_memory().used)
+    except Exception as e:
+        logger.error(f"System metrics sampling failed: {e}")
+    try:
+        await _sample_job_metrics()
+    except Exception as e:
+        logger.error(f"Job metrics sampling failed: {e}")
+    if _sampler_task is None or _sampler_task.done():
+        _sampler_task = asyncio.create_task(_system_metrics_loop())
+
+
 @router.get(
     "/metrics",
     summary="Prometheus metrics",
@@ -81,17 +142,9 @@ async def get_metrics() -> Response:
     """
     Expose Prometheus metrics.
     """
-    # Update system metrics
-    cpu_usage.set(psutil.cpu_percent(interval=0.1))
-    memory_usage.set(psutil.virtual_memory().used)
-    
-    # Update job metrics
-    try:
-        from ..core.job_storage import job_storage
-        stats = await job_storage.get_stats()
-        active_jobs.set(stats.get("processing", 0))
-    except:
-        pass
+    # System and job metrics are kept fresh by the background sampler
+    # (normally started by the lifespan; started here if it wasn't)
+    await start_metrics_sampler()
     
     # Generate metrics
     metrics = generate_latest()
@@ -4,10 +4,13 @@ Abstracts OCR operations from API endpoints.
 """
 
 import hashlib
+import threading
 import time
+from collections import OrderedDict
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import numpy as np
-import cv2
 import re
 
 from ..config import get_settings
@@ -15,17 +18,33 @@ from ..models import (
     RawOCR, OCRSpan, DeckSections, CardEntry, 
     CardCandidate, NormalizedCard, NormalizedDeck, DeckResult
 )
-from ..pipeline.preprocess import preprocess_variants
-from ..pipeline.ocr import run_easyocr_best_of, run_vision_fallback
-from ..matching.fuzzy import score_candidates
+from ..pipeline.preprocess import decode_image, ink_score, iter_preprocess_variants
+from ..pipeline.ocr import gpu_batching, run_easyocr_batched, run_easyocr_best_of, run_vision_fallback
+from ..matching.fuzzy import build_index, score_candidates_batch
 from ..matching.scryfall_client import SCRYFALL
-from ..business_rules import apply_mtgo_land_fix, validate_and_fill
-from ..cache_manager import cache_manager, cached
+from ..business_rules import validate_and_fill
+from ..cache_manager import cache_manager
 from ..telemetry import logger
 from ..error_taxonomy import OCR_FAILED, VALIDATION_FAILED
 
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:  # pragma: no cover - optional fast hasher
+    _blake3 = None
+
 S = get_settings()
 
+# Per-card enrichment is independent and mostly I/O or GIL-free rapidfuzz work
+_ENRICH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ocr-enrich")
+# Recent uploads remembered by hash_image (each entry keeps its bytes for verification)
+_HASH_MEMO_SIZE = 4
+
+# One match per line that looks like a card entry ("4 Island", "4x Island").
+# Lines are pre-stripped; [^\S\n] keeps a match from spilling into the next line.
+_QTY_RX = re.compile(r"(?m)^(\d+|[1-9]\dx)[^\S\n]+\S+")
+# One pass per span: sideboard marker (prefix, checked first) or card entry
+_SPAN_RX = re.compile(r"^\s*(?:(?P<side>(?i:sideboard|sb))|(?P<qty>\d+)[xX]?\s+(?P<name>.+?)\s*$)")
+
 class OCRService:
     """Service for OCR processing operations."""
     
@@ -33,10 +52,63 @@ class OCRService:
         """Initialize OCR service."""
         self.scryfall = SCRYFALL
         self.cache = cache_manager
+        # Loaded on first use, not at import (the Celery parent must not
+        # open the SQLite connection its prefork children would inherit)
+        self._names: List[str] = []
+        self._names_gen: Optional[int] = None
+        self._fuzzy_index = None
+        self._hash_memo: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+        self._hash_lock = threading.Lock()
+    
+    @property
+    def names(self) -> List[str]:
+        """English card-name corpus, reloaded only when the offline DB changes."""
+        gen = self.scryfall.generation
+        if not self._names or self._names_gen != gen:
+            # Empty: first use, or DB hydrated after an empty load
+            self._names = self.scryfall.all_names()
+            self._names_gen = gen
+        return self._names
+    
+    def fuzzy_index(self) -> Tuple[List[str], Tuple]:
+        """(corpus, build_index(corpus)) for batch scoring, built once per corpus."""
+        names = self.names
+        built = self._fuzzy_index
+        if built is None or built[0] is not names:
+            built = self._fuzzy_index = (names, build_index(names))
+        return built
     
     def hash_image(self, image_data: bytes) -> str:
-        """Generate hash for image data."""
-        return hashlib.sha256(image_data).hexdigest()
+        """Generate hash for image data.
+        
+        Re-uploads of a recent image (client retries) reuse its digest: a
+        cheap length + head/tail fingerprint finds the candidate and a
+        byte comparison confirms it, so no different image can match.
+        """
+        key = (len(image_data), image_data[:64], image_data[-64:])
+        with self._hash_lock:
+            hit = self._hash_memo.get(key)
+            if hit is not None and hit[0] == image_data:
+                self._hash_memo.move_to_end(key)
+                return hit[1]
+        
+        digest = self._digest(image_data)
+        with self._hash_lock:
+            self._hash_memo[key] = (bytes(image_data), digest)
+            self._hash_memo.move_to_end(key)
+            while len(self._hash_memo) > _HASH_MEMO_SIZE:
+                self._hash_memo.popitem(last=False)
+        return digest
+    
+    def _digest(self, image_data: bytes) -> str:
+        """Content digest of image data.
+        
+        Uses BLAKE3 when installed unless IMAGE_HASH_ALGO=sha256; digests
+        are namespaced so the two algorithms never share cache entries.
+        """
+        if _blake3 is not None and S.IMAGE_HASH_ALGO == "blake3":
+            return "b3:" + _blake3(image_data).hexdigest()
+        return hashlib.sha256(image_data, usedforsecurity=False).hexdigest()
     
     def process_image(self, image_data: bytes, job_id: str, trace_id: str) -> DeckResult:
         """
@@ -56,47 +128,38 @@ class OCRService:
         """
         # Check cache first
         image_hash = self.hash_image(image_data)
-        cached_result = self.cache.get_ocr_result(image_hash)
+        cached_result = self.cache.get_ocr_result_bytes(image_hash)
         if cached_result:
             logger.info(f"Cache hit for job {job_id}")
-            cached_result["jobId"] = job_id
-            cached_result["traceId"] = trace_id
-            return DeckResult(**cached_result)
+            return DeckResult.model_validate_json(cached_result).model_copy(
+                update={"jobId": job_id, "traceId": trace_id}
+            )
         
         # Decode image
-        img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+        img = self._decode_image(image_data)
         if img is None:
             raise ValueError("Cannot decode image")
         
-        # Track timings
-        timings = {}
-        
-        # Preprocessing
-        t0 = time.time()
-        variants = preprocess_variants(img)
-        timings["preprocess"] = (time.time() - t0) * 1000
+        # Stage durations in integer ns (monotonic clock), converted to ms once
+        timings: Dict[str, int] = {}
         
-        # OCR processing
-        t1 = time.time()
-        ocr_raw = self._perform_ocr(variants)
-        timings["ocr"] = (time.time() - t1) * 1000
+        # Preprocessing + OCR, one variant at a time
+        ocr_raw = self._perform_ocr(img, timings)
         
         # Parse cards from OCR text
         raw = self._create_raw_ocr(ocr_raw)
         parsed = self._parse_cards(raw.spans)
         
         # Validate and enrich with Scryfall
-        t2 = time.time()
-        parsed = self._enrich_with_scryfall(parsed)
-        normalized = self._normalize_deck(parsed)
+        t2 = time.perf_counter_ns()
+        parsed, normalized = self._enrich_with_scryfall(parsed)
         
         # Apply business rules
-        text_lines = [s.text for s in raw.spans]
-        normalized = apply_mtgo_land_fix(normalized, text_lines)
         normalized = validate_and_fill(normalized)
-        timings["scryfall"] = (time.time() - t2) * 1000
+        timings["scryfall"] = time.perf_counter_ns() - t2
         
         timings["total"] = sum(timings.values())
+        timings_ms = {stage: ns / 1e6 for stage, ns in timings.items()}
         
         # Create result
         result = DeckResult(
@@ -104,33 +167,71 @@ class OCRService:
             raw=raw,
             parsed=parsed,
             normalized=normalized,
-            timings_ms=timings,
+            timings_ms=timings_ms,
             traceId=trace_id
         )
         
         # Cache result
-        self.cache.cache_ocr_result(image_hash, result.dict(), ttl=3600)
+        self.cache.cache_ocr_result_bytes(image_hash, result.model_dump_json().encode(), ttl=3600)
         
         return result
     
-    def _perform_ocr(self, variants: List[np.ndarray]) -> Dict:
+    def _decode_image(self, image_data: bytes) -> Optional[np.ndarray]:
+        """Decode upload to a BGR array (reduced-size for large sources, see decode_image)."""
+        return decode_image(image_data)
+    
+    def _perform_ocr(self, img: np.ndarray, timings: Dict[str, int]) -> Dict:
         """
-        Perform OCR on image variants.
+        Perform OCR on preprocessed variants of an image.
+        
+        On CPU, variants are generated lazily and OCR'd as they arrive, so at
+        most the current variant and the fallback candidate are held in memory.
+        On GPU they are collected and recognized in one batch.
         
         Args:
-            variants: List of preprocessed image variants
+            img: Decoded BGR image
+            timings: Receives "preprocess" and "ocr" durations in ns
             
         Returns:
             OCR results dictionary
         """
-        ocr_raw = run_easyocr_best_of(variants)
+        variants = iter_preprocess_variants(img)
+        track_ink = S.ENABLE_VISION_FALLBACK
+        best = {"img": None, "ink": -1}
+        prep_ns = 0
+        
+        def scan():
+            nonlocal prep_ns
+            while True:
+                t = time.perf_counter_ns()
+                im = next(variants, None)
+                prep_ns += time.perf_counter_ns() - t
+                if im is None:
+                    return
+                if track_ink:
+                    # Fallback candidate: the variant with the most ink
+                    ink = ink_score(im)
+                    if ink > best["ink"]:
+                        best["img"], best["ink"] = im, ink
+                yield im
+        
+        t0 = time.perf_counter_ns()
+        # GPU: one batched call over all variants; CPU: stream with early termination
+        run_ocr = run_easyocr_batched if gpu_batching() else run_easyocr_best_of
+        ocr_raw = run_ocr(scan())
+        total_ns = time.perf_counter_ns() - t0
         
         # Check if fallback is needed
         if self._should_use_fallback(ocr_raw):
             logger.info("OCR confidence low, using fallback")
-            best_img = max(variants, key=lambda im: cv2.countNonZero(im))
-            ocr_raw = run_vision_fallback(best_img)
-        
+            # Early termination may have left variants unseen: rank them too
+            for _ in scan():
+                pass
+            ocr_raw = run_vision_fallback(best["img"])
+            total_ns = time.perf_counter_ns() - t0
+        
+        timings["preprocess"] = prep_ns
+        timings["ocr"] = total_ns - prep_ns
         return ocr_raw
     
     def _should_use_fallback(self, ocr_raw: Dict) -> bool:
@@ -143,16 +244,18 @@ class OCRService:
             return True
         
         # Check line count
-        qty_lines = self._count_quantity_lines(ocr_raw["spans"])
+        # Only "fewer than OCR_MIN_LINES?" matters: stop counting at the threshold
+        qty_lines = self._count_quantity_lines(ocr_raw["spans"], limit=S.OCR_MIN_LINES)
         if qty_lines < S.OCR_MIN_LINES:
             return True
         
         return False
     
-    def _count_quantity_lines(self, spans: List[Dict]) -> int:
-        """Count lines that look like card entries."""
-        rx = re.compile(r"^\s*(\d+|[1-9]\dx)\s+\S+")
-        return sum(1 for s in spans if rx.match(s["text"].strip().lower()))
+    def _count_quantity_lines(self, spans: List[Dict], limit: Optional[int] = None) -> int:
+        """Count lines that look like card entries, stopping at `limit` if given."""
+        # Lowercased once for the whole text rather than per span
+        text = "\n".join(s["text"].strip() for s in spans).lower()
+        return sum(1 for _ in islice(_QTY_RX.finditer(text), limit))
     
     def _create_raw_ocr(self, ocr_raw: Dict) -> RawOCR:
         """Create RawOCR model from OCR results."""
@@ -174,138 +277,148 @@ class OCRService:
         """
         main_entries = []
         side_entries = []
-        section = "main"
+        section = main_entries
         
         for span in spans:
-            line = span.text.strip()
+            m = _SPAN_RX.match(span.text)
+            if m is None:
+                continue
             
-            # Check for sideboard marker
-            if line.lower().startswith(("sideboard", "sb")):
-                section = "side"
+            # Sideboard marker
+            if m.group("side") is not None:
+                section = side_entries
                 continue
             
-            # Parse card entry
-            entry = self._parse_card_line(line)
-            if entry:
-                if section == "main":
-                    main_entries.append(entry)
-                else:
-                    side_entries.append(entry)
+            # Card entry
+            qty = int(m.group("qty"))
+            if qty > 0:
+                section.append(CardEntry(qty=qty, name=m.group("name")))
         
         return DeckSections(main=main_entries, side=side_entries)
     
-    def _parse_card_line(self, line: str) -> Optional[CardEntry]:
-        """Parse a single card line."""
-        parts = line.split(" ", 1)
-        if len(parts) != 2:
-            return None
-        
-        qty_str, name = parts
-        
-        # Parse quantity
-        qty = 0
-        if qty_str.isdigit():
-            qty = int(qty_str)
-        elif qty_str.lower().endswith("x") and qty_str[:-1].isdigit():
-            qty = int(qty_str[:-1])
-        
-        if qty > 0 and name:
-            return CardEntry(qty=qty, name=name)
+    def _enrich_with_scryfall(self, parsed: DeckSections) -> Tuple[DeckSections, NormalizedDeck]:
+        """
+        Enrich parsed deck with Scryfall data and normalize it in the same pass.
         
-        return None
-    
-    @cached(prefix="scryfall_enrich", ttl=7200)
-    def _enrich_with_scryfall(self, parsed: DeckSections) -> DeckSections:
-        """Enrich parsed deck with Scryfall data."""
-        return DeckSections(
-            main=self._enrich_entries(parsed.main),
-            side=self._enrich_entries(parsed.side)
+        Each distinct name is enriched once even when it appears in both
+        sections. The per-name results are cached under the sorted name set,
+        so the same list hits regardless of order or section split.
+        """
+        names = list(dict.fromkeys(e.name for e in chain(parsed.main, parsed.side)))
+        key = self.cache._make_key("deck_enrich", self.cache._hash_key("\n".join(sorted(names))))
+        by_name = self.cache.get(key)
+        if by_name is None:
+            by_name = dict(zip(names, self._enrich_names(names)))
+            # IDs the resolver didn't return: one batched offline lookup
+            missing = [name for name, _, sid in by_name.values() if sid is None]
+            if missing:
+                cards = self.scryfall.lookup_by_names(missing)
+                for raw_name, (name, candidates, sid) in by_name.items():
+                    if sid is None and name in cards:
+                        by_name[raw_name] = (name, candidates, cards[name].get("id"))
+            self.cache.set(key, by_name, ttl=7200)
+        main, main_norm = self._rebuild_entries(parsed.main, by_name)
+        side, side_norm = self._rebuild_entries(parsed.side, by_name)
+        return (
+            DeckSections(main=main, side=side),
+            NormalizedDeck(main=main_norm, side=side_norm)
         )
     
-    def _enrich_entries(self, entries: List[CardEntry]) -> List[CardEntry]:
-        """Enrich card entries with Scryfall validation."""
-        enriched = []
-        names = self.scryfall.all_names()
-        
+    def _rebuild_entries(
+        self, entries: List[CardEntry], by_name: Dict[str, Tuple]
+    ) -> Tuple[List[CardEntry], List[NormalizedCard]]:
+        """Apply per-name enrichment results to entries, keeping quantities."""
+        rebuilt = []
+        normalized = []
         for entry in entries:
-            # Local fuzzy matching
-            candidates_local = []
-            if names:
-                # Check cache first
-                cached_fuzzy = self.cache.get_fuzzy_match(entry.name)
-                if cached_fuzzy:
-                    candidates_local = cached_fuzzy
-                else:
-                    candidates_local = score_candidates(entry.name, names, limit=S.FUZZY_MATCH_TOPK)
-                    self.cache.cache_fuzzy_match(entry.name, candidates_local)
-            
-            # Scryfall resolution
-            resolved = {"name": entry.name, "id": None, "candidates": []}
+            name, candidates, scryfall_id = by_name[entry.name]
+            rebuilt.append(CardEntry.model_construct(qty=entry.qty, name=name, candidates=candidates))
+            normalized.append(NormalizedCard.model_construct(qty=entry.qty, name=name, scryfall_id=scryfall_id))
+        return rebuilt, normalized
+    
+    def _enrich_names(self, names: List[str]) -> List[Tuple[str, List[CardCandidate], Optional[str]]]:
+        """Resolved name, merged candidates and Scryfall ID for each distinct card name."""
+        local = self._local_candidates(names)
+        resolved = self._resolve_names(names) if S.ALWAYS_VERIFY_SCRYFALL else [None] * len(names)
+        if len(names) < 2:
+            return [self._enrich_one(*args) for args in zip(names, local, resolved)]
+        return list(_ENRICH_POOL.map(self._enrich_one, names, local, resolved))
+    
+    def _resolve_names(self, names: List[str]) -> List[Optional[Dict]]:
+        """Cached Scryfall resolutions per name; misses are batch-resolved by exact name."""
+        out = [self.cache.get_scryfall_card(name) for name in names]
+        misses = [name for name, hit in zip(names, out) if not hit]
+        if misses:
+            found = self.scryfall.resolve_many(misses)
+            for name, card in found.items():
+                self.cache.cache_scryfall_card(name, card)
+            out = [hit or found.get(name) for name, hit in zip(names, out)]
+        return out
+    
+    def _local_candidates(self, names: List[str]) -> List[List[Tuple]]:
+        """Local fuzzy candidates per name; cache misses are scored in one batch."""
+        if not self.names:
+            return [[] for _ in names]
+        out: List[List[Tuple]] = [[] for _ in names]
+        misses = []
+        for i, name in enumerate(names):
+            # Check cache first
+            cached_fuzzy = self.cache.get_fuzzy_match(name)
+            if cached_fuzzy:
+                out[i] = cached_fuzzy
+            else:
+                misses.append(i)
+        if misses:
+            corpus, index = self.fuzzy_index()
+            batch = score_candidates_batch(
+                [names[i] for i in misses], corpus, index,
+                limit=S.FUZZY_MATCH_TOPK
+            )
+            for i, candidates in zip(misses, batch):
+                out[i] = candidates
+                self.cache.cache_fuzzy_match(names[i], candidates)
+        return out
+    
+    def _enrich_one(
+        self, name: str, candidates_local: List[Tuple], resolved: Optional[Dict]
+    ) -> Tuple[str, List[CardCandidate], Optional[str]]:
+        """Resolve a single card name and merge its candidates."""
+        # Scryfall resolution (full fuzzy cascade for names the batch didn't settle)
+        if resolved is None:
+            resolved = {"name": name, "id": None, "candidates": []}
             if S.ALWAYS_VERIFY_SCRYFALL:
-                # Check cache first
-                cached_card = self.cache.get_scryfall_card(entry.name)
-                if cached_card:
-                    resolved = cached_card
-                else:
-                    resolved = self.scryfall.resolve(entry.name, topk=S.FUZZY_MATCH_TOPK)
-                    self.cache.cache_scryfall_card(entry.name, resolved)
-            
-            # Merge candidates
-            merged = self._merge_candidates(candidates_local, resolved.get("candidates", []))
-            
-            enriched.append(CardEntry(
-                qty=entry.qty,
-                name=resolved["name"],
-                candidates=merged
-            ))
+                resolved = self.scryfall.resolve(name, topk=S.FUZZY_MATCH_TOPK)
+                self.cache.cache_scryfall_card(name, resolved)
+        
+        # Merge candidates
+        merged = self._merge_candidates(candidates_local, resolved.get("candidates", []))
         
-        return enriched
+        return resolved["name"], merged, resolved.get("id")
     
     def _merge_candidates(self, local: List[Tuple], scryfall: List[Dict]) -> List[CardCandidate]:
-        """Merge local and Scryfall candidates."""
-        merged = []
-        seen = set()
+        """Merge local and Scryfall candidates, deduplicating case-insensitively."""
+        # Keyed on the case-folded name; the first spelling seen is kept for
+        # display, and dict order preserves local-then-Scryfall ranking
+        merged: Dict[str, CardCandidate] = {}
         
-        # Add local candidates
+        # Add local candidates (trusted: produced by our own matcher, no validation)
         for name, score in local:
-            if name not in seen:
-                merged.append(CardCandidate(name=name, score=score))
-                seen.add(name)
+            key = name.casefold()
+            if key not in merged:
+                merged[key] = CardCandidate.model_construct(name=name, score=float(score))
         
         # Add Scryfall candidates
         for candidate in scryfall:
             name = candidate["name"]
-            if name not in seen:
-                merged.append(CardCandidate(
+            key = name.casefold()
+            if key not in merged:
+                merged[key] = CardCandidate.model_construct(
                     name=name,
-                    score=candidate.get("score", 0.0)
-                ))
-                seen.add(name)
+                    score=float(candidate.get("score", 0.0))
+                )
         
-        return merged
-    
-    def _normalize_deck(self, parsed: DeckSections) -> NormalizedDeck:
-        """Normalize deck with Scryfall IDs."""
-        return NormalizedDeck(
-            main=self._normalize_entries(parsed.main),
-            side=self._normalize_entries(parsed.side)
-        )
-    
-    def _normalize_entries(self, entries: List[CardEntry]) -> List[NormalizedCard]:
-        """Normalize card entries with Scryfall IDs."""
-        normalized = []
-        
-        for entry in entries:
-            # Lookup Scryfall ID
-            scryfall_id = None
-            cards = self.scryfall.lookup_by_name(entry.name)
-            if cards:
-                scryfall_id = cards[0].get("id")
-            
-            normalized.append(NormalizedCard(
-                qty=entry.qty,
-                name=entry.name,
-                scryfall_id=scryfall_id
-            ))
-        
-        return normalized
\ No newline at end of file
+        return list(merged.values())
+
+
+# Shared instance: keeps the name corpus loaded across requests
+OCR_SERVICE = OCRService()
@@ -4,21 +4,25 @@ Handles background job processing with Redis as broker.
 """
 
 from celery import Celery
-from typing import Dict, Any
+from celery.signals import worker_process_init
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import threading
 import time
-import numpy as np
-import cv2
 from .config import get_settings
-from .pipeline.preprocess import preprocess_variants
-from .pipeline.ocr import run_easyocr_best_of, run_vision_fallback
-from .matching.fuzzy import score_candidates
+from .core.job_storage import PROCESSING_COUNT_KEY
+from .pipeline.preprocess import VariantBuffers, decode_image, most_ink, preprocess_variants
+from .pipeline.ocr import run_easyocr_best_of, run_vision_fallback, start_reader_warmup
+from .pipeline.lines import DECK_LINE_RX, should_use_fallback
+from .matching.fuzzy import score_candidates_batch
 from .matching.scryfall_client import SCRYFALL
-from .models import RawOCR, OCRSpan, DeckSections, CardEntry, CardCandidate, NormalizedCard, NormalizedDeck
+from .services.ocr_service import OCR_SERVICE
+from .models import DeckSections, CardEntry, CardCandidate, NormalizedCard, NormalizedDeck
 from .business_rules import apply_mtgo_land_fix, validate_and_fill
 from .telemetry import logger
 import redis
-import json
-import re
+import orjson
 
 S = get_settings()
 
@@ -42,10 +46,80 @@ celery_app.conf.update(
     task_soft_time_limit=25,
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=100,
+    # Bounded, kept-alive broker/backend connections instead of per-publish churn
+    broker_pool_limit=S.REDIS_POOL_SIZE,
+    broker_transport_options={
+        "max_connections": S.REDIS_POOL_SIZE,
+        "socket_keepalive": True,
+        "health_check_interval": 30,
+    },
+    redis_max_connections=S.REDIS_POOL_SIZE,
+    redis_socket_keepalive=True,
 )
 
-# Redis client for job status
-redis_client = redis.from_url(str(S.REDIS_URL)) if S.USE_REDIS else None
+# Redis client for job status, over a shared pool other sync modules can reuse
+redis_pool = redis.ConnectionPool.from_url(
+    str(S.REDIS_URL),
+    max_connections=S.REDIS_POOL_SIZE,
+    socket_keepalive=True,
+    health_check_interval=30,
+) if S.USE_REDIS else None
+redis_client = redis.Redis(connection_pool=redis_pool) if redis_pool else None
+
+# Variant output arrays reused across tasks; set only in prefork children,
+# which run one task at a time
+_VARIANT_BUFFERS = None
+
+@worker_process_init.connect
+def _init_worker_buffers(**_):
+    global _VARIANT_BUFFERS
+    _VARIANT_BUFFERS = VariantBuffers()
+    # After the fork: the reader (and CUDA) belong to this child only
+    start_reader_warmup()
+
+# Job-status writes run on one thread, in submission order
+_STATUS_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-status")
+
+# Progress write that never replaces a terminal state: the writer only orders
+# writes within one process, and a redelivered task may run on another worker.
+# Both scripts keep the shared processing counter (see job_storage) in step
+# with the state they replace.
+_SET_PROGRESS = redis_client.register_script("""
+local cur = redis.call('GET', KEYS[1])
+local prev = nil
+if cur then
+    local ok, job = pcall(cjson.decode, cur)
+    if ok then
+        if job.state == 'completed' or job.state == 'failed' then
+            return 0
+        end
+        prev = job.state
+    end
+end
+redis.call('SETEX', KEYS[1], ARGV[1], ARGV[2])
+if ARGV[3] == 'processing' and prev ~= 'processing' then
+    redis.call('INCR', KEYS[2])
+end
+return 1
+""") if redis_client else None
+
+_SET_TERMINAL = redis_client.register_script("""
+local cur = redis.call('GET', KEYS[1])
+if cur then
+    local ok, job = pcall(cjson.decode, cur)
+    if ok and job.state == 'processing' then
+        redis.call('DECR', KEYS[2])
+    end
+end
+redis.call('SETEX', KEYS[1], ARGV[1], ARGV[2])
+return 1
+""") if redis_client else None
+
+_TERMINAL_STATES = ("completed", "failed")
+
+def _log_status_write_error(write):
+    if write.exception() is not None:
+        logger.warning(f"Job progress write failed: {write.exception()}")
 
 def update_job_status(job_id: str, status: str, progress: int = 0, result: Dict = None, error: str = None):
     """Update job status in Redis."""
@@ -63,12 +137,17 @@ def update_job_status(job_id: str, status: str, progress: int = 0, result: Dict
     if error:
         job_data["error"] = error
     
-    # Store with 1 hour TTL
-    redis_client.setex(
-        f"job:{job_id}",
-        3600,
-        json.dumps(job_data)
-    )
+    # Store with 1 hour TTL; numpy scalars (OCR confidences) serialize without conversion
+    key = f"job:{job_id}"
+    payload = orjson.dumps(job_data, option=orjson.OPT_SERIALIZE_NUMPY)
+    if status in _TERMINAL_STATES:
+        # Terminal states are durable before the task returns (and land after
+        # any progress write still queued, the writer being single-threaded)
+        _STATUS_WRITER.submit(_SET_TERMINAL, keys=[key, PROCESSING_COUNT_KEY], args=[3600, payload]).result()
+    else:
+        # Progress is best effort: don't hold the pipeline for the round-trip
+        write = _STATUS_WRITER.submit(_SET_PROGRESS, keys=[key, PROCESSING_COUNT_KEY], args=[3600, payload, status])
+        write.add_done_callback(_log_status_write_error)
 
 def get_job_status(job_id: str) -> Dict:
     """Get job status from Redis."""
@@ -77,9 +156,71 @@ def get_job_status(job_id: str) -> Dict:
     
     data = redis_client.get(f"job:{job_id}")
     if data:
-        return json.loads(data)
+        return orjson.loads(data)
     return {"state": "not_found"}
 
+# Per-process memo of Scryfall answers: decks repeat names (basics, playsets)
+# and so do consecutive tasks. Scoped to one DB generation (persistent, see
+# Scryfall.generation) so a re-hydrated DB is never answered from stale
+# entries; misses are not stored, so a transient online failure is retried.
+_MEMO_SIZE = 4096
+_MEMO_LOCK = threading.Lock()
+_memo_generation: Optional[int] = None
+_RESOLVED: "OrderedDict[tuple, Dict]" = OrderedDict()
+_IDS: "OrderedDict[str, str]" = OrderedDict()
+
+def _memoized(memo: OrderedDict, key, generation: int, compute, keep):
+    global _memo_generation
+    with _MEMO_LOCK:
+        if _memo_generation != generation:
+            _RESOLVED.clear()
+            _IDS.clear()
+            _memo_generation = generation
+        hit = memo.get(key)
+        if hit is not None:
+            memo.move_to_end(key)
+            return hit
+    value = compute()
+    if keep(value):
+        with _MEMO_LOCK:
+            if _memo_generation == generation:
+                memo[key] = value
+                while len(memo) > _MEMO_SIZE:
+                    memo.popitem(last=False)
+    return value
+
+def _resolve(name: str, topk: int, generation: int) -> Dict:
+    # Only identified cards are kept: a raw fallback may be a lookup failure
+    return _memoized(_RESOLVED, (name, topk), generation,
+                     lambda: SCRYFALL.resolve(name, topk=topk),
+                     lambda r: r.get("id") is not None)
+
+def _lookup_id(name: str, generation: int) -> Optional[str]:
+    def lookup():
+        cards = SCRYFALL.lookup_by_name(name)
+        return cards[0].get("id") if cards else None
+    return _memoized(_IDS, name, generation, lookup, lambda cid: cid is not None)
+
+def _parse_lines(text_lines: List[str]) -> DeckSections:
+    """
+    Parse OCR lines into deck sections.
+    
+    Every line is matched in one map() pass; the first sideboard marker
+    splits the matches, and each section's entries are built in one go.
+    """
+    matches = [m for m in map(DECK_LINE_RX.match, text_lines) if m is not None]
+    split = next((i for i, m in enumerate(matches) if m.group("side") is not None), len(matches))
+    
+    def entries(ms):
+        # Later markers inside the sideboard are skipped like any non-entry
+        return [
+            CardEntry.model_construct(qty=qty, name=m.group("name"))
+            for m in ms
+            if m.group("side") is None and (qty := int(m.group("qty"))) > 0
+        ]
+    
+    return DeckSections.model_construct(main=entries(matches[:split]), side=entries(matches[split + 1:]))
+
 @celery_app.task(bind=True, name='process_ocr')
 def process_ocr_task(self, job_id: str, image_data: bytes) -> Dict:
     """
@@ -97,7 +238,7 @@ def process_ocr_task(self, job_id: str, image_data: bytes) -> Dict:
         update_job_status(job_id, "processing", 10)
         
         # Decode image
-        img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+        img = decode_image(image_data)
         if img is None:
             raise ValueError("Cannot decode image")
         
@@ -105,7 +246,7 @@ def process_ocr_task(self, job_id: str, image_data: bytes) -> Dict:
         
         # Preprocessing
         t0 = time.time()
-        variants = preprocess_variants(img)
+        variants = preprocess_variants(img, _VARIANT_BUFFERS)
         preprocess_time = (time.time() - t0) * 1000
         
         update_job_status(job_id, "processing", 40)
@@ -115,95 +256,87 @@ def process_ocr_task(self, job_id: str, image_data: bytes) -> Dict:
         ocr_raw = run_easyocr_best_of(variants)
         
         # Fallback to Vision if confidence is low
-        def count_qty_lines(spans):
-            rx = re.compile(r"^\\s*(\\d+|[1-9]\\dx)\\s+\\S+")
-            return sum(1 for s in spans if rx.match(s["text"].strip().lower()))
-        
-        if (ocr_raw["mean_conf"] < S.OCR_MIN_CONF or 
-            count_qty_lines(ocr_raw["spans"]) < S.OCR_MIN_LINES) and S.ENABLE_VISION_FALLBACK:
-            best_img = max(variants, key=lambda im: cv2.countNonZero(im))
+        if should_use_fallback(ocr_raw, S):
+            best_img = most_ink(variants)
             ocr_raw = run_vision_fallback(best_img)
         
         ocr_time = (time.time() - t1) * 1000
         
         update_job_status(job_id, "processing", 60)
         
-        # Parse cards
-        spans = [OCRSpan(text=s["text"], conf=s["conf"]) for s in ocr_raw["spans"]]
-        raw = RawOCR(spans=spans, mean_conf=ocr_raw["mean_conf"])
-        
-        text_lines = [s.text for s in spans]
-        main_entries = []
-        side_entries = []
-        section = "main"
-        
-        for line in text_lines:
-            l = line.strip()
-            if l.lower().startswith("sideboard") or l.lower().startswith("sb"):
-                section = "side"
-                continue
-            
-            qty = 0
-            name = ""
-            parts = l.split(" ", 1)
-            
-            if len(parts) == 2 and parts[0].isdigit():
-                qty = int(parts[0])
-                name = parts[1]
-            elif len(parts) == 2 and parts[0].lower().endswith("x") and parts[0][:-1].isdigit():
-                qty = int(parts[0][:-1])
-                name = parts[1]
-            
-            if qty > 0 and name:
-                if section == "main":
-                    main_entries.append(CardEntry(qty=qty, name=name))
-                else:
-                    side_entries.append(CardEntry(qty=qty, name=name))
+        # Parse cards; raw is only ever serialized, so it stays a plain RawOCR-shaped dict
+        # One walk over the spans yields both the serialized spans and the lines
+        raw_spans = []
+        text_lines = []
+        for s in ocr_raw["spans"]:
+            text_lines.append(s["text"])
+            raw_spans.append({"text": s["text"], "conf": float(s["conf"])})
+        raw = {"spans": raw_spans, "mean_conf": float(ocr_raw["mean_conf"])}
+        
+        parsed = _parse_lines(text_lines)
         
         update_job_status(job_id, "processing", 80)
         
-        # Scryfall validation
+        # Local fuzzy candidates (CPU); the corpus and its index are shared with
+        # the API service and survive across tasks
         t2 = time.time()
-        parsed = DeckSections(main=main_entries, side=side_entries)
+        names, index = OCR_SERVICE.fuzzy_index()
+        # All of a section's names scored in one vectorized pass
+        local = {
+            key: score_candidates_batch(
+                [e.name for e in entries], names, index, limit=S.FUZZY_MATCH_TOPK
+            )
+            for key, entries in (("main", parsed.main), ("side", parsed.side))
+        }
         
-        # Fuzzy matching and Scryfall resolution
-        names = SCRYFALL.all_names()
+        # One read of the DB generation per job (it's a PRAGMA round-trip)
+        generation = SCRYFALL.generation
         
-        def enrich(entries):
+        # Scryfall resolution; IDs the resolver returns are kept for normalization
+        ids: Dict[str, Optional[str]] = {}
+        
+        def enrich(entries, local):
             out = []
-            for e in entries:
-                cands_local = score_candidates(e.name, names, limit=S.FUZZY_MATCH_TOPK) if names else []
-                resolved = SCRYFALL.resolve(e.name, topk=S.FUZZY_MATCH_TOPK) if S.ALWAYS_VERIFY_SCRYFALL else {
+            for e, cands_local in zip(entries, local):
+                resolved = _resolve(e.name, S.FUZZY_MATCH_TOPK, generation) if S.ALWAYS_VERIFY_SCRYFALL else {
                     "name": e.name, "id": None, "candidates": []
                 }
                 
-                merged = []
-                seen = set()
+                # Dict order keeps local-then-Scryfall ranking; first occurrence wins
+                merged: Dict[str, CardCandidate] = {}
                 for cand, sc in cands_local:
-                    if cand not in seen:
-                        merged.append(CardCandidate(name=cand, score=sc))
-                        seen.add(cand)
+                    if cand not in merged:
+                        merged[cand] = CardCandidate.model_construct(name=cand, score=float(sc))
                 
                 for c in resolved.get("candidates", []):
                     n = c["name"]
-                    if n not in seen:
-                        merged.append(CardCandidate(name=n, score=c.get("score", 0.0)))
-                        seen.add(n)
+                    if n not in merged:
+                        merged[n] = CardCandidate.model_construct(name=n, score=float(c.get("score", 0.0)))
                 
-                out.append(CardEntry(qty=e.qty, name=resolved["name"], candidates=merged))
+                if resolved.get("id"):
+                    ids[resolved["name"]] = resolved["id"]
+                out.append(CardEntry.model_construct(qty=e.qty, name=resolved["name"], candidates=list(merged.values())))
             return out
         
-        parsed = DeckSections(main=enrich(parsed.main), side=enrich(parsed.side))
+        parsed = DeckSections.model_construct(
+            main=enrich(parsed.main, local["main"]),
+            side=enrich(parsed.side, local["side"])
+        )
+        
+        # Normalize: resolver IDs first; a (memoized) lookup only for names it left
+        # without one, and only if the offline DB has anything to find
+        offline_db = bool(names)
         
-        # Normalize
         def to_norm(entries):
-            res = []
-            for e in entries:
-                sid = SCRYFALL.lookup_by_name(e.name)[0].get("id") if SCRYFALL.lookup_by_name(e.name) else None
-                res.append(NormalizedCard(qty=e.qty, name=e.name, scryfall_id=sid))
-            return res
+            return [
+                NormalizedCard.model_construct(
+                    qty=e.qty, name=e.name,
+                    scryfall_id=ids.get(e.name) or (_lookup_id(e.name, generation) if offline_db else None)
+                )
+                for e in entries
+            ]
         
-        normalized = NormalizedDeck(main=to_norm(parsed.main), side=to_norm(parsed.side))
+        normalized = NormalizedDeck.model_construct(main=to_norm(parsed.main), side=to_norm(parsed.side))
         
         # Apply business rules
         normalized = apply_mtgo_land_fix(normalized, text_lines)
@@ -214,9 +347,9 @@ def process_ocr_task(self, job_id: str, image_data: bytes) -> Dict:
         # Prepare result
         result = {
             "jobId": job_id,
-            "raw": raw.dict(),
-            "parsed": parsed.dict(),
-            "normalized": normalized.dict(),
+            "raw": raw,
+            "parsed": parsed.model_dump(),
+            "normalized": normalized.model_dump(),
             "timings_ms": {
                 "preprocess": preprocess_time,
                 "ocr": ocr_time,
@@ -235,4 +368,4 @@ def process_ocr_task(self, job_id: str, image_data: bytes) -> Dict:
     except Exception as e:
         logger.error(f"OCR job {job_id} failed: {str(e)}")
         update_job_status(job_id, "failed", 0, error=str(e))
-        raise
\ No newline at end of file
+        raise
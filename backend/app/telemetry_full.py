@@ -3,14 +3,15 @@ Distributed tracing and observability with OpenTelemetry.
 Provides comprehensive tracing across all services.
 """
 
-import json
 import time
+import orjson
 import uuid
 import logging
 import sys
 from typing import Optional, Dict, Any
 from contextlib import contextmanager
 
+from grpc import Compression
 from opentelemetry import trace, metrics
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
@@ -31,9 +32,19 @@ from opentelemetry.metrics import get_meter_provider, set_meter_provider
 
 # Keep the original JSON formatter for backward compatibility
 class JsonFormatter(logging.Formatter):
+    # (epoch second, formatted) of the last record: strftime runs once per second, not per line
+    _ts_cache = (None, "")
+    
+    def _timestamp(self, created: float) -> str:
+        sec = int(created)
+        cached = self._ts_cache
+        if cached[0] != sec:
+            cached = self._ts_cache = (sec, time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(sec)))
+        return cached[1]
+    
     def format(self, record):
         payload = {
-            "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "ts": self._timestamp(record.created),
             "level": record.levelname,
             "msg": record.getMessage(),
             "logger": record.name
@@ -45,7 +56,7 @@ class JsonFormatter(logging.Formatter):
             payload["trace_id"] = record.trace_id
         if hasattr(record, "span_id"):
             payload["span_id"] = record.span_id
-        return json.dumps(payload, ensure_ascii=False)
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()
 
 # Configure basic logger
 basic_logger = logging.getLogger("app")
@@ -122,14 +133,21 @@ class TelemetryManager:
         # Create OTLP exporter
         otlp_exporter = OTLPSpanExporter(
             endpoint=endpoint,
-            insecure=True  # Use TLS in production
+            insecure=True,  # Use TLS in production
+            compression=Compression.Gzip  # span attributes are highly repetitive
         )
         
         # Create tracer provider
         self.tracer_provider = TracerProvider(resource=resource)
         
-        # Add batch processor
-        span_processor = BatchSpanProcessor(otlp_exporter)
+        # Add batch processor: large, infrequent exports keep wake-ups off OCR workers
+        span_processor = BatchSpanProcessor(
+            otlp_exporter,
+            max_queue_size=8192,
+            max_export_batch_size=2048,
+            schedule_delay_millis=2000,
+            export_timeout_millis=10000
+        )
         self.tracer_provider.add_span_processor(span_processor)
         
         # Set global tracer provider
@@ -143,13 +161,14 @@ class TelemetryManager:
         # Create OTLP metric exporter
         otlp_metric_exporter = OTLPMetricExporter(
             endpoint=endpoint,
-            insecure=True
+            insecure=True,
+            compression=Compression.Gzip
         )
         
         # Create metric reader
         metric_reader = PeriodicExportingMetricReader(
             exporter=otlp_metric_exporter,
-            export_interval_millis=10000  # Export every 10 seconds
+            export_interval_millis=30000  # Export every 30 seconds
         )
         
         # Create meter provider
@@ -348,48 +367,48 @@ class TracedLogger:
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
     
-    def _add_trace_context(self, extra: dict = None) -> dict:
-        """Add trace context to log extra."""
-        if extra is None:
-            extra = {}
-        
-        trace_id = telemetry.get_current_trace_id()
-        if trace_id:
-            extra["trace_id"] = trace_id
-        
+    def _add_trace_context(self, extra: dict = None) -> Optional[dict]:
+        """Add trace context to log extra (untouched when no span is recording)."""
         span = trace.get_current_span()
-        if span and span.is_recording():
-            extra["span_id"] = format(span.get_span_context().span_id, "016x")
+        if not span.is_recording():
+            return extra
         
+        # Both ids from one context lookup
+        ctx = span.get_span_context()
+        if extra is None:
+            extra = {}
+        extra["trace_id"] = format(ctx.trace_id, "032x")
+        extra["span_id"] = format(ctx.span_id, "016x")
         return extra
     
+    def _log(self, level: int, msg: str, args, kwargs):
+        # Disabled levels return before any trace-context work
+        if self.logger.isEnabledFor(level):
+            kwargs["extra"] = self._add_trace_context(kwargs.get("extra"))
+            self.logger.log(level, msg, *args, **kwargs)
+    
     def debug(self, msg: str, *args, **kwargs):
         """Log debug with trace context."""
-        kwargs["extra"] = self._add_trace_context(kwargs.get("extra"))
-        self.logger.debug(msg, *args, **kwargs)
+        self._log(logging.DEBUG, msg, args, kwargs)
     
     def info(self, msg: str, *args, **kwargs):
         """Log info with trace context."""
-        kwargs["extra"] = self._add_trace_context(kwargs.get("extra"))
-        self.logger.info(msg, *args, **kwargs)
+        self._log(logging.INFO, msg, args, kwargs)
     
     def warning(self, msg: str, *args, **kwargs):
         """Log warning with trace context."""
-        kwargs["extra"] = self._add_trace_context(kwargs.get("extra"))
-        self.logger.warning(msg, *args, **kwargs)
+        self._log(logging.WARNING, msg, args, kwargs)
     
     def error(self, msg: str, *args, **kwargs):
         """Log error with trace context."""
-        kwargs["extra"] = self._add_trace_context(kwargs.get("extra"))
-        self.logger.error(msg, *args, **kwargs)
+        self._log(logging.ERROR, msg, args, kwargs)
         
         # Record error metric
         telemetry.record_error("application_error")
     
     def critical(self, msg: str, *args, **kwargs):
         """Log critical with trace context."""
-        kwargs["extra"] = self._add_trace_context(kwargs.get("extra"))
-        self.logger.critical(msg, *args, **kwargs)
+        self._log(logging.CRITICAL, msg, args, kwargs)
         
         # Record error metric
         telemetry.record_error("critical_error")
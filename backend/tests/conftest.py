@@ -2,22 +2,27 @@
 Pytest configuration and fixtures for Screen2Deck tests.
 """
 
+import copy
+import functools
+import struct
+import sys
+import uuid
+import zlib
 import pytest
 import asyncio
+from contextlib import ExitStack
 from typing import Generator
-from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
-import numpy as np
-import cv2
+from unittest.mock import MagicMock, Mock, patch
 
-# Import app and dependencies
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# App modules are imported inside the fixtures that need them, so collecting
+# pure unit tests doesn't pull in FastAPI, OpenCV and the OCR stack.
+# backend/ is put on sys.path by pytest.ini (pythonpath).
 
-from app.main import app
-from app.config import Settings, get_settings
-from app.cache_manager import CacheManager
+def pytest_addoption(parser):
+    parser.addoption(
+        "--snapshot-update", action="store_true", default=False,
+        help="(Re)write golden export snapshots"
+    )
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -26,30 +31,61 @@ def event_loop():
     yield loop
     loop.close()
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_settings():
     """Override settings for testing."""
+    from app.config import Settings
     test_settings = Settings()
     test_settings.USE_REDIS = False  # Use memory cache in tests
     test_settings.ALWAYS_VERIFY_SCRYFALL = False  # Disable external calls
     test_settings.ENABLE_VISION_FALLBACK = False
     return test_settings
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_settings(test_settings):
     """Mock get_settings to return test settings."""
     with patch('app.config.get_settings', return_value=test_settings):
         yield test_settings
 
-@pytest.fixture
-def client(mock_settings) -> Generator:
-    """Create test client."""
+@pytest.fixture(scope="session")
+def client(mock_settings, mock_scryfall) -> Generator:
+    """Create test client (app started once for the whole session).
+
+    Depends on mock_scryfall so no API test can reach the real client.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
     with TestClient(app) as c:
         yield c
 
 @pytest.fixture
-def mock_cache():
-    """Mock cache manager."""
+def isolated_client(client) -> Generator:
+    """Shared test client with a rate-limit bucket no other test shares.
+
+    The limiter keys on X-Forwarded-For, so a per-test UUID there gives this
+    test its own window. No second TestClient: its lifespan exit would tear
+    down the job storage and Scryfall cache the session client still uses.
+    """
+    client.headers["X-Forwarded-For"] = f"test-{uuid.uuid4().hex}"
+    try:
+        yield client
+    finally:
+        del client.headers["X-Forwarded-For"]
+
+@pytest.fixture(autouse=True)
+def reset_app_state(request):
+    """Clear per-app state the shared client accumulates between tests."""
+    if "client" not in request.fixturenames:
+        return
+    from app.core.config import get_settings
+    from app.core.rate_limit import memory_storage
+    memory_storage.clear()
+    get_settings.cache_clear()
+
+@pytest.fixture(scope="session")
+def _mock_cache_template():
+    """Configured cache-manager mock, built once; tests get deep copies."""
+    from app.cache_manager import CacheManager
     cache = Mock(spec=CacheManager)
     cache.get.return_value = None
     cache.set.return_value = True
@@ -58,21 +94,44 @@ def mock_cache():
     return cache
 
 @pytest.fixture
+def mock_cache(_mock_cache_template):
+    """Mock cache manager (per test: tests set their own return values)."""
+    return copy.deepcopy(_mock_cache_template)
+
+def _build_sample_png() -> bytes:
+    """Encode the sample test image as PNG using only the standard library.
+
+    600x400 white RGB image with three text-like black bars (rows 50-100,
+    120-170, 190-240; columns 50-350 inclusive).
+    """
+    width, height = 400, 600
+    white, black = b"\xff\xff\xff", b"\x00\x00\x00"
+    blank_row = b"\x00" + white * width
+    bar_row = b"\x00" + white * 50 + black * 301 + white * (width - 351)
+    bars = ((50, 100), (120, 170), (190, 240))
+    raw = b"".join(
+        bar_row if any(top <= y <= bottom for top, bottom in bars) else blank_row
+        for y in range(height)
+    )
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data)))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 9))
+            + chunk(b"IEND", b""))
+
+# Deterministic, so encode once at import instead of per test
+_SAMPLE_PNG_BYTES = _build_sample_png()
+
+@pytest.fixture(scope="session")
 def sample_image():
     """Create a sample test image."""
-    # Create a simple white image with text-like patterns
-    img = np.ones((600, 400, 3), dtype=np.uint8) * 255
-    
-    # Add some text-like black rectangles
-    cv2.rectangle(img, (50, 50), (350, 100), (0, 0, 0), -1)
-    cv2.rectangle(img, (50, 120), (350, 170), (0, 0, 0), -1)
-    cv2.rectangle(img, (50, 190), (350, 240), (0, 0, 0), -1)
-    
-    # Encode as PNG
-    _, buffer = cv2.imencode('.png', img)
-    return buffer.tobytes()
+    return _SAMPLE_PNG_BYTES
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_ocr_result():
     """Sample OCR result for testing."""
     return {
@@ -86,7 +145,7 @@ def sample_ocr_result():
         "mean_conf": 0.91
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_deck_result():
     """Sample deck result for testing."""
     return {
@@ -121,45 +180,61 @@ def sample_deck_result():
         "traceId": "test-trace-123"
     }
 
-@pytest.fixture
-def auth_headers():
-    """Generate auth headers with test JWT token."""
+@functools.lru_cache(maxsize=1)
+def _token() -> str:
+    """Test JWT; the payload is constant so it's signed only once."""
     from app.auth import create_access_token
-    token = create_access_token(
+    return create_access_token(
         data={"job_id": "test-job", "permissions": ["ocr:read", "ocr:write"]}
     )
-    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    """Generate auth headers with test JWT token."""
+    return {"Authorization": f"Bearer {_token()}"}
 
 @pytest.fixture
+def patched_job_status(mocker):
+    """app.tasks.get_job_status patched for one test; set return_value."""
+    return mocker.patch('app.tasks.get_job_status')
+
+# Canned Scryfall responses, built once
+_SCRYFALL_NAMES = [
+    "Lightning Bolt",
+    "Counterspell",
+    "Teferi, Hero of Dominaria",
+    "Negate"
+]
+_SCRYFALL_RESOLVED = {
+    "name": "Lightning Bolt",
+    "id": "abc123",
+    "candidates": []
+}
+_SCRYFALL_LOOKUP = [
+    {"id": "abc123", "name": "Lightning Bolt"}
+]
+
+@pytest.fixture(scope="session")
 def mock_scryfall():
-    """Mock Scryfall client."""
-    with patch('app.matching.scryfall_client.SCRYFALL') as mock:
-        mock.all_names.return_value = [
-            "Lightning Bolt",
-            "Counterspell",
-            "Teferi, Hero of Dominaria",
-            "Negate"
-        ]
-        mock.resolve.return_value = {
-            "name": "Lightning Bolt",
-            "id": "abc123",
-            "candidates": []
-        }
-        mock.lookup_by_name.return_value = [
-            {"id": "abc123", "name": "Lightning Bolt"}
-        ]
-        yield mock
+    """Mock Scryfall client, from first request to the end of the session.
 
-@pytest.fixture
-def mock_redis():
-    """Mock Redis client."""
-    with patch('redis.from_url') as mock:
-        redis_mock = Mock()
-        redis_mock.get.return_value = None
-        redis_mock.set.return_value = True
-        redis_mock.setex.return_value = True
-        redis_mock.delete.return_value = 1
-        redis_mock.exists.return_value = 0
-        redis_mock.ping.return_value = True
-        mock.return_value = redis_mock
-        yield redis_mock
\ No newline at end of file
+    Replaces the client at its source and at every binding already made by
+    `from ...scryfall_client import SCRYFALL` (plus OCR_SERVICE.scryfall);
+    modules imported later pick the mock up from the source. Use
+    monkeypatch.setattr(mock_scryfall, ...) to override a method per test.
+    """
+    from app.matching import scryfall_client
+    real = scryfall_client.SCRYFALL
+    mock = MagicMock()
+    mock.all_names.return_value = _SCRYFALL_NAMES
+    mock.resolve.return_value = _SCRYFALL_RESOLVED
+    mock.lookup_by_name.return_value = _SCRYFALL_LOOKUP
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(scryfall_client, "SCRYFALL", mock))
+        for name, module in list(sys.modules.items()):
+            if name.startswith("app.") and vars(module).get("SCRYFALL") is real:
+                stack.enter_context(patch.object(module, "SCRYFALL", mock))
+        ocr_service = sys.modules.get("app.services.ocr_service")
+        if ocr_service is not None and ocr_service.OCR_SERVICE.scryfall is real:
+            stack.enter_context(patch.object(ocr_service.OCR_SERVICE, "scryfall", mock))
+        yield mock
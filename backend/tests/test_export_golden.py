@@ -4,17 +4,34 @@ Ensures export format consistency and correctness
 """
 
 import pytest
+import csv
+import io
 import json
+import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
 
-from app.exporters.mtga import MTGAExporter
-from app.exporters.moxfield import MoxfieldExporter
-from app.exporters.archidekt import ArchidektExporter
-from app.exporters.tappedout import TappedOutExporter
+from app.exporters.mtga import export_mtga
+from app.exporters.moxfield import export_moxfield
+from app.exporters.archidekt import export_archidekt
+from app.exporters.tappedout import export_tappedout
+from app.models import NormalizedCard, NormalizedDeck
+
+# Read-only deck models: every test in the module shares the same sample, so
+# an exporter mutating its input fails loudly instead of skewing the others
+class _FrozenCard(NormalizedCard, frozen=True):
+    pass
+
+class _FrozenDeck(NormalizedDeck, frozen=True):
+    main: Tuple[_FrozenCard, ...]
+    side: Tuple[_FrozenCard, ...]
+
+def _deck(data: Dict) -> _FrozenDeck:
+    """Deck model for the exporters from plain {"main": [...], "side": [...]} data."""
+    return _FrozenDeck.model_validate(data)
 
 # Sample deck for testing
-SAMPLE_DECK = {
+_SAMPLE_DECK = {
     "main": [
         {"qty": 4, "name": "Lightning Bolt", "scryfall_id": "a57af4df-566c-4c65-9cfe-31a96f8e4e3f", "set": "2xm", "collector_number": "129"},
         {"qty": 4, "name": "Counterspell", "scryfall_id": "ce30f926-bc06-46ee-9f35-26e4d7e2a5c8", "set": "mh2", "collector_number": "267"},
@@ -31,162 +48,120 @@ SAMPLE_DECK = {
     ]
 }
 
-# Golden outputs for each format
+SAMPLE_DECK = _deck(_SAMPLE_DECK)
+
+# Golden outputs for each format (extra keys like set/collector_number are
+# not part of NormalizedCard, so no exporter prints them)
 GOLDEN_MTGA = """Deck
-4 Lightning Bolt (2XM) 129
-4 Counterspell (MH2) 267
-2 Teferi, Time Raveler (WAR) 221
-24 Island (XLN) 265
-26 Mountain (XLN) 273
+4 Lightning Bolt
+4 Counterspell
+2 Teferi, Time Raveler
+24 Island
+26 Mountain
 
 Sideboard
-3 Surgical Extraction (NPH) 74
-2 Damping Sphere (DOM) 213
-2 Pyroblast (ICE) 213
-4 Relic of Progenitus (EMA) 231
-4 Blood Moon (A25) 122"""
+3 Surgical Extraction
+2 Damping Sphere
+2 Pyroblast
+4 Relic of Progenitus
+4 Blood Moon"""
 
 GOLDEN_MOXFIELD = """4 Lightning Bolt
 4 Counterspell
 2 Teferi, Time Raveler
 24 Island
 26 Mountain
-
-Sideboard:
 3 Surgical Extraction
 2 Damping Sphere
 2 Pyroblast
 4 Relic of Progenitus
 4 Blood Moon"""
 
-GOLDEN_ARCHIDEKT = """// Main
-4 Lightning Bolt
+GOLDEN_ARCHIDEKT = """Count,Name,Categories
+4,Lightning Bolt,Mainboard
+4,Counterspell,Mainboard
+2,"Teferi, Time Raveler",Mainboard
+24,Island,Mainboard
+26,Mountain,Mainboard
+3,Surgical Extraction,Sideboard
+2,Damping Sphere,Sideboard
+2,Pyroblast,Sideboard
+4,Relic of Progenitus,Sideboard
+4,Blood Moon,Sideboard"""
+
+GOLDEN_TAPPEDOUT = """4 Lightning Bolt
 4 Counterspell
 2 Teferi, Time Raveler
 24 Island
 26 Mountain
 
-// Sideboard
+Sideboard
 3 Surgical Extraction
 2 Damping Sphere
 2 Pyroblast
 4 Relic of Progenitus
 4 Blood Moon"""
 
-GOLDEN_TAPPEDOUT = """4x Lightning Bolt
-4x Counterspell
-2x Teferi, Time Raveler
-24x Island
-26x Mountain
+def _normalize(text: str) -> str:
+    """Strip the text and each of its lines, keeping line order."""
+    return "\n".join(line.strip() for line in text.strip().split("\n"))
 
-Sideboard:
-3x Surgical Extraction
-2x Damping Sphere
-2x Pyroblast
-4x Relic of Progenitus
-4x Blood Moon"""
+# Normalized golden output per format, computed once at import
+_GOLDEN = {
+    "mtga": _normalize(GOLDEN_MTGA),
+    "moxfield": _normalize(GOLDEN_MOXFIELD),
+    "archidekt": _normalize(GOLDEN_ARCHIDEKT),
+    "tappedout": _normalize(GOLDEN_TAPPEDOUT),
+}
+
+# Card lines of the text formats; headers ("Deck", "Sideboard") never start
+# with a digit so they can't match
+_CARD_LINE_RX = {
+    # "4 Lightning Bolt"
+    "mtga": re.compile(r"^[ \t]*(\d+)[ \t]+(.+?)[ \t]*$", re.M),
+    "moxfield": re.compile(r"^[ \t]*(\d+)[ \t]+(.+?)[ \t]*$", re.M),
+    "tappedout": re.compile(r"^[ \t]*(\d+)[ \t]+(.+?)[ \t]*$", re.M),
+}
+
+def _card_lines(fmt: str, text: str):
+    """(qty, name) pairs of an export's card lines."""
+    if fmt == "archidekt":
+        # Real CSV: an unquoted comma in a name adds a field and fails the unpack
+        rows = csv.reader(io.StringIO(text))
+        next(rows)  # Count,Name,Categories
+        return [(qty, name) for qty, name, _ in rows]
+    return _CARD_LINE_RX[fmt].findall(text)
+
+# Exporters are plain functions of a NormalizedDeck
+EXPORTERS = {
+    "mtga": export_mtga,
+    "moxfield": export_moxfield,
+    "archidekt": export_archidekt,
+    "tappedout": export_tappedout,
+}
+
+@pytest.fixture(scope="session")
+def sample_exports():
+    """SAMPLE_DECK exported once per format, shared by the tests below."""
+    return {fmt: export(SAMPLE_DECK) for fmt, export in EXPORTERS.items()}
 
 class TestExportGolden:
     """Test export formats against golden outputs"""
     
-    def test_mtga_export(self):
-        """Test MTGA format export"""
-        exporter = MTGAExporter()
-        result = exporter.export(SAMPLE_DECK)
-        
-        # Normalize line endings for comparison
-        result_lines = result.strip().split('\n')
-        golden_lines = GOLDEN_MTGA.strip().split('\n')
-        
-        assert len(result_lines) == len(golden_lines), f"Line count mismatch: {len(result_lines)} vs {len(golden_lines)}"
-        
-        for i, (result_line, golden_line) in enumerate(zip(result_lines, golden_lines)):
-            assert result_line.strip() == golden_line.strip(), f"Line {i+1} mismatch:\nGot: {result_line}\nExpected: {golden_line}"
-    
-    def test_moxfield_export(self):
-        """Test Moxfield format export"""
-        exporter = MoxfieldExporter()
-        result = exporter.export(SAMPLE_DECK)
-        
-        result_lines = result.strip().split('\n')
-        golden_lines = GOLDEN_MOXFIELD.strip().split('\n')
-        
-        assert len(result_lines) == len(golden_lines), f"Line count mismatch: {len(result_lines)} vs {len(golden_lines)}"
-        
-        for i, (result_line, golden_line) in enumerate(zip(result_lines, golden_lines)):
-            assert result_line.strip() == golden_line.strip(), f"Line {i+1} mismatch:\nGot: {result_line}\nExpected: {golden_line}"
-    
-    def test_archidekt_export(self):
-        """Test Archidekt format export"""
-        exporter = ArchidektExporter()
-        result = exporter.export(SAMPLE_DECK)
-        
-        result_lines = result.strip().split('\n')
-        golden_lines = GOLDEN_ARCHIDEKT.strip().split('\n')
-        
-        assert len(result_lines) == len(golden_lines), f"Line count mismatch: {len(result_lines)} vs {len(golden_lines)}"
-        
-        for i, (result_line, golden_line) in enumerate(zip(result_lines, golden_lines)):
-            assert result_line.strip() == golden_line.strip(), f"Line {i+1} mismatch:\nGot: {result_line}\nExpected: {golden_line}"
-    
-    def test_tappedout_export(self):
-        """Test TappedOut format export"""
-        exporter = TappedOutExporter()
-        result = exporter.export(SAMPLE_DECK)
-        
-        result_lines = result.strip().split('\n')
-        golden_lines = GOLDEN_TAPPEDOUT.strip().split('\n')
-        
-        assert len(result_lines) == len(golden_lines), f"Line count mismatch: {len(result_lines)} vs {len(golden_lines)}"
-        
-        for i, (result_line, golden_line) in enumerate(zip(result_lines, golden_lines)):
-            assert result_line.strip() == golden_line.strip(), f"Line {i+1} mismatch:\nGot: {result_line}\nExpected: {golden_line}"
+    @pytest.mark.parametrize("fmt", list(EXPORTERS))
+    def test_export_golden(self, fmt, sample_exports):
+        """Test each format export against its golden output"""
+        # pytest's assertion rewriting renders a line diff on mismatch
+        assert _normalize(sample_exports[fmt]) == _GOLDEN[fmt]
     
-    def test_export_consistency(self):
+    def test_export_consistency(self, sample_exports):
         """Test that all formats export the same cards"""
-        exporters = {
-            'mtga': MTGAExporter(),
-            'moxfield': MoxfieldExporter(),
-            'archidekt': ArchidektExporter(),
-            'tappedout': TappedOutExporter()
-        }
-        
         # Extract card counts from each export
         card_counts = {}
         
-        for format_name, exporter in exporters.items():
-            result = exporter.export(SAMPLE_DECK)
-            counts = {}
-            
+        for format_name, result in sample_exports.items():
             # Parse the export to count cards
-            for line in result.split('\n'):
-                line = line.strip()
-                if not line or line.startswith('//') or line.endswith(':'):
-                    continue
-                
-                # Extract quantity and name
-                if format_name == 'mtga':
-                    # Format: "4 Lightning Bolt (SET) NUM"
-                    parts = line.split(' (')
-                    if len(parts) >= 1:
-                        qty_name = parts[0]
-                        if ' ' in qty_name:
-                            qty, name = qty_name.split(' ', 1)
-                            counts[name] = int(qty)
-                
-                elif format_name == 'tappedout':
-                    # Format: "4x Lightning Bolt"
-                    if 'x ' in line:
-                        qty, name = line.split('x ', 1)
-                        counts[name] = int(qty)
-                
-                else:
-                    # Format: "4 Lightning Bolt"
-                    if ' ' in line:
-                        parts = line.split(' ', 1)
-                        if parts[0].isdigit():
-                            counts[parts[1]] = int(parts[0])
-            
+            counts = {name: int(qty) for qty, name in _card_lines(format_name, result)}
             card_counts[format_name] = counts
         
         # Verify all formats have same cards
@@ -225,15 +200,9 @@ class TestExportGolden:
         }
         
         # Test each exporter handles special cards
-        exporters = [
-            MTGAExporter(),
-            MoxfieldExporter(),
-            ArchidektExporter(),
-            TappedOutExporter()
-        ]
-        
-        for exporter in exporters:
-            result = exporter.export(special_deck)
+        deck = _deck(special_deck)
+        for export in EXPORTERS.values():
+            result = export(deck)
             
             # Verify all cards are present
             assert "Delver of Secrets" in result or "Insectile Aberration" in result
@@ -243,15 +212,14 @@ class TestExportGolden:
             assert "Borborygmos" in result
     
     @pytest.mark.parametrize("deck_size,expected_main,expected_side", [
-        ({"main": [{"qty": 60, "name": "Island"}], "side": []}, 60, 0),
-        ({"main": [{"qty": 40, "name": "Island"}], "side": []}, 40, 0),  # Limited
-        ({"main": [{"qty": 60, "name": "Island"}], "side": [{"qty": 15, "name": "Mountain"}]}, 60, 15),
-        ({"main": [{"qty": 100, "name": "Island"}], "side": []}, 100, 0),  # Commander
+        ({"main": [{"qty": 60, "name": "Island", "scryfall_id": None}], "side": []}, 60, 0),
+        ({"main": [{"qty": 40, "name": "Island", "scryfall_id": None}], "side": []}, 40, 0),  # Limited
+        ({"main": [{"qty": 60, "name": "Island", "scryfall_id": None}], "side": [{"qty": 15, "name": "Mountain", "scryfall_id": None}]}, 60, 15),
+        ({"main": [{"qty": 100, "name": "Island", "scryfall_id": None}], "side": []}, 100, 0),  # Commander
     ])
     def test_deck_sizes(self, deck_size, expected_main, expected_side):
         """Test various deck sizes are handled correctly"""
-        exporter = MTGAExporter()
-        result = exporter.export(deck_size)
+        result = export_mtga(_deck(deck_size))
         
         # Count cards in result
         main_count = 0
@@ -275,9 +243,13 @@ class TestExportGolden:
         assert main_count == expected_main, f"Main deck size mismatch: {main_count} vs {expected_main}"
         assert side_count == expected_side, f"Sideboard size mismatch: {side_count} vs {expected_side}"
 
-@pytest.fixture
-def golden_dir(tmp_path):
-    """Create temporary golden files directory"""
+def test_snapshot_update(request, tmp_path):
+    """Test snapshot update mechanism"""
+    # This would be used in CI to update golden files when needed
+    # Run with: pytest tests/test_export_golden.py --snapshot-update
+    if not request.config.getoption("--snapshot-update"):
+        pytest.skip("golden files are only written with --snapshot-update")
+    
     golden_path = tmp_path / "golden"
     golden_path.mkdir()
     
@@ -286,11 +258,3 @@ def golden_dir(tmp_path):
     (golden_path / "moxfield.txt").write_text(GOLDEN_MOXFIELD)
     (golden_path / "archidekt.txt").write_text(GOLDEN_ARCHIDEKT)
     (golden_path / "tappedout.txt").write_text(GOLDEN_TAPPEDOUT)
-    
-    return golden_path
-
-def test_snapshot_update(golden_dir):
-    """Test snapshot update mechanism"""
-    # This would be used in CI to update golden files when needed
-    # Run with: pytest tests/test_export_golden.py --snapshot-update
-    pass
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Tests for fuzzy card-name matching.
+"""
+
+import pytest
+
+from app.matching.fuzzy import build_index, score_candidates, score_candidates_batch
+
+CORPUS = [
+    "Lightning Bolt",
+    "Lightning Helix",
+    "Chain Lightning",
+    "Counterspell",
+    "Teferi, Time Raveler",
+    "Teferi, Hero of Dominaria",
+    "Island",
+    "Mountain",
+    "Blood Moon",
+    "Relic of Progenitus",
+    "Surgical Extraction",
+    "Séance",
+]
+
+QUERIES = ["Lightnig Bolt", "counterspel", "Teferi Time Raveler", "Islnd", "Seance", "Blod Moon"]
+
+
+class TestScoreCandidatesBatch:
+    @pytest.mark.parametrize("limit", [1, 3, 5])
+    def test_matches_score_candidates(self, limit):
+        """Same candidates and scores as the per-name scorer (float32 aside)."""
+        batch = score_candidates_batch(QUERIES, CORPUS, build_index(CORPUS), limit=limit)
+        for query, got in zip(QUERIES, batch):
+            expected = score_candidates(query, CORPUS, limit=limit)
+            assert [name for name, _ in got][:1] == [name for name, _ in expected][:1]
+            assert dict(got) == pytest.approx(dict(expected), abs=1e-3)
+
+    def test_scores_sorted_descending(self):
+        (got,) = score_candidates_batch(["Lightning"], CORPUS, build_index(CORPUS), limit=5)
+        scores = [score for _, score in got]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_empty_inputs(self):
+        index = build_index(CORPUS)
+        assert score_candidates_batch([], CORPUS, index) == []
+        assert score_candidates_batch(["Island"], [], build_index([])) == [[]]
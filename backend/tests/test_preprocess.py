@@ -0,0 +1,105 @@
+"""
+Tests for upload decoding in the preprocessing pipeline.
+"""
+
+import cv2
+import numpy as np
+
+from app.pipeline.preprocess import _exif_orientation, _source_height, decode_image
+
+
+def _exif_app1(orientation: int) -> bytes:
+    """APP1 segment holding a big-endian TIFF IFD0 with one Orientation entry."""
+    tiff = (
+        b"MM\x00\x2a" + (8).to_bytes(4, "big")
+        + (1).to_bytes(2, "big")
+        + (0x0112).to_bytes(2, "big") + (3).to_bytes(2, "big") + (1).to_bytes(4, "big")
+        + orientation.to_bytes(2, "big") + b"\x00\x00"
+        + (0).to_bytes(4, "big")
+    )
+    payload = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload
+
+
+def _jpeg(height: int, width: int, orientation: int = None) -> bytes:
+    img = np.zeros((height, width, 3), np.uint8)
+    img[: height // 2] = 255
+    ok, buf = cv2.imencode(".jpg", img)
+    assert ok
+    data = buf.tobytes()
+    if orientation is not None:
+        # Right after SOI, where cameras put it
+        data = data[:2] + _exif_app1(orientation) + data[2:]
+    return data
+
+
+def _png_header(width: int, height: int) -> bytes:
+    ihdr = width.to_bytes(4, "big") + height.to_bytes(4, "big") + b"\x08\x02\x00\x00\x00"
+    return b"\x89PNG\r\n\x1a\n" + (13).to_bytes(4, "big") + b"IHDR" + ihdr
+
+
+def _segment(marker: int, payload: bytes) -> bytes:
+    return bytes((0xFF, marker)) + (len(payload) + 2).to_bytes(2, "big") + payload
+
+
+def _sof(marker: int, height: int, width: int) -> bytes:
+    components = b"\x01\x22\x00\x02\x11\x01\x03\x11\x01"
+    return _segment(marker, b"\x08" + height.to_bytes(2, "big") + width.to_bytes(2, "big") + b"\x03" + components)
+
+
+class TestSourceHeight:
+    def test_png(self):
+        assert _source_height(_png_header(640, 3200)) == 3200
+
+    def test_baseline_jpeg(self):
+        # DHT (0xC4) sits in the SOFn range but carries no size: skipped
+        data = b"\xff\xd8" + _segment(0xE0, b"JFIF\x00" + bytes(9)) + _segment(0xC4, bytes(20)) + _sof(0xC0, 3024, 4032)
+        assert _source_height(data) == 3024
+
+    def test_progressive_jpeg(self):
+        data = b"\xff\xd8" + _segment(0xE0, b"JFIF\x00" + bytes(9)) + _sof(0xC2, 1800, 1200)
+        assert _source_height(data) == 1800
+
+    def test_encoded_jpegs(self):
+        img = np.zeros((48, 32, 3), np.uint8)
+        for params in ([], [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]):
+            ok, buf = cv2.imencode(".jpg", img, params)
+            assert ok
+            assert _source_height(buf.tobytes()) == 48
+
+    def test_truncated_headers(self):
+        data = b"\xff\xd8" + _segment(0xE0, b"JFIF\x00" + bytes(9)) + _sof(0xC0, 3024, 4032)
+        assert _source_height(data[:-12]) == 0
+        assert _source_height(_png_header(640, 3200)[:20]) == 0
+
+    def test_garbage(self):
+        assert _source_height(b"") == 0
+        assert _source_height(b"GIF89a" + bytes(32)) == 0
+        # JPEG magic followed by something that isn't a marker
+        assert _source_height(b"\xff\xd8\xff" + bytes(32)) == 0
+        # Segment length pointing past the end
+        assert _source_height(b"\xff\xd8\xff\xe0\xff\xff" + bytes(16)) == 0
+
+
+class TestExifOrientation:
+    def test_reads_orientation_tag(self):
+        assert _exif_orientation(_jpeg(20, 40, orientation=6)) == 6
+
+    def test_defaults_to_upright(self):
+        assert _exif_orientation(_jpeg(20, 40)) == 1
+        assert _exif_orientation(b"\x89PNG\r\n\x1a\n") == 1
+        assert _exif_orientation(b"\xff\xd8\xff\xe1\x00") == 1
+
+
+class TestDecodeImage:
+    def test_orientation_6_is_rotated_upright(self):
+        # Stored 20x40 (h x w), displayed rotated 90° clockwise: 40x20
+        img = decode_image(_jpeg(20, 40, orientation=6))
+        assert img.shape[:2] == (40, 20)
+
+    def test_unrotated_jpeg_keeps_its_shape(self):
+        img = decode_image(_jpeg(20, 40))
+        assert img.shape[:2] == (20, 40)
+
+    def test_garbage_is_undecodable(self):
+        assert decode_image(b"not an image") is None
@@ -1,15 +1,21 @@
-import os, time, requests
+import os, asyncio, httpx, pytest
 from pathlib import Path
 BASE = os.getenv("API_BASE", "http://localhost:8080")
 IMG_DIR = Path("validation_set")
+POLL_BUDGET_S = 5.0  # total sleep allowed per job (was 50 x 0.1s)
+async def _run_one(client, p):
+    r = await client.post("/api/ocr/upload", files={"file": (p.name, p.read_bytes())}); r.raise_for_status()
+    jobId = r.json()["jobId"]
+    delay, waited = 0.05, 0.0
+    while waited < POLL_BUDGET_S:
+        s = (await client.get(f"/api/ocr/status/{jobId}")).json()
+        if s["state"] == "completed": return
+        await asyncio.sleep(delay); waited += delay; delay = min(delay * 1.5, 1.0)
+    raise AssertionError("Timeout " + p.name)
+async def _run_all(imgs):
+    async with httpx.AsyncClient(base_url=BASE, timeout=30.0) as client:
+        await asyncio.gather(*[_run_one(client, p) for p in imgs])
+@pytest.mark.xdist_group("serial")  # hits a live server
 def test_all():
     imgs = list(IMG_DIR.glob("*")); assert imgs, "Placez vos images dans validation_set/"
-    for p in imgs:
-        with open(p, "rb") as f:
-            r = requests.post(f"{BASE}/api/ocr/upload", files={"file": f}); r.raise_for_status()
-            jobId = r.json()["jobId"]
-        for _ in range(50):
-            s = requests.get(f"{BASE}/api/ocr/status/{jobId}").json()
-            if s["state"] == "completed": break
-            time.sleep(0.1)
-        else: raise AssertionError("Timeout " + p.name)
\ No newline at end of file
+    asyncio.run(_run_all(imgs))
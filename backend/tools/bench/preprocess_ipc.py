@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Preprocessing dispatch benchmark for Screen2Deck
+Compares preprocess_bytes in the spawned process pool (pickled variants
+sent back) against asyncio.to_thread (OpenCV releases the GIL)
+
+Usage (from backend/): python tools/bench/preprocess_ipc.py validation_set/*.jpg
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.pipeline.preprocess import preprocess_bytes  # noqa: E402
+
+
+async def _run(uploads, submit, concurrency):
+    """Wall time per upload (ms) with `concurrency` requests in flight."""
+    sem = asyncio.Semaphore(concurrency)
+    times = []
+
+    async def one(data):
+        async with sem:
+            t0 = time.perf_counter()
+            await submit(data)
+            times.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(d) for d in uploads))
+    return times, time.perf_counter() - t0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="+", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    uploads = [p.read_bytes() for p in args.images] * args.repeat
+    workers = max(1, (os.cpu_count() or 2) // 2)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    loop = asyncio.get_running_loop()
+    # Start the workers (and their imports) before timing
+    await asyncio.gather(*(loop.run_in_executor(pool, preprocess_bytes, uploads[0]) for _ in range(workers)))
+
+    variants = preprocess_bytes(uploads[0])
+    print(f"variants returned per upload: {sum(v.nbytes for v in variants) / 1e6:.1f} MB")
+
+    modes = {
+        "process pool": lambda d: loop.run_in_executor(pool, preprocess_bytes, d),
+        "to_thread": lambda d: asyncio.to_thread(preprocess_bytes, d),
+    }
+    for name, submit in modes.items():
+        times, wall = await _run(uploads, submit, args.concurrency)
+        print(f"{name:>12}: p50 {statistics.median(times):7.1f} ms  "
+              f"max {max(times):7.1f} ms  throughput {len(uploads) / wall:5.1f} img/s")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
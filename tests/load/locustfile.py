@@ -21,6 +21,9 @@ def generate_test_image():
     bio.seek(0)
     return bio.read()
 
+# Encoded once at import: tasks reuse the same bytes instead of re-rendering per request
+TEST_IMAGE = generate_test_image()
+
 class Screen2DeckUser(FastHttpUser):
     """Load test user for Screen2Deck API."""
     
@@ -28,8 +31,7 @@ class Screen2DeckUser(FastHttpUser):
     
     def on_start(self):
         """Initialize user session."""
-        # Generate test image once
-        self.test_image = generate_test_image()
+        self.test_image = TEST_IMAGE
         self.job_ids = []
         
         # Get authentication token (if needed)
@@ -120,7 +122,7 @@ class WebSocketUser(HttpUser):
     def on_start(self):
         """Initialize WebSocket connection."""
         # Upload an image to get a job ID
-        image = generate_test_image()
+        image = TEST_IMAGE
         response = self.client.post(
             "/api/ocr/upload",
             files={"file": ("test.png", image, "image/png")}
@@ -172,7 +174,7 @@ class StressTestUser(FastHttpUser):
     @task
     def stress_upload(self):
         """Stress test with rapid uploads."""
-        image = generate_test_image()
+        image = TEST_IMAGE
         self.client.post(
             "/api/ocr/upload",
             files={"file": ("stress.png", image, "image/png")}
@@ -205,7 +207,7 @@ class SpikeTestUser(FastHttpUser):
         """Simulate spike traffic."""
         # Suddenly increase load
         for _ in range(10):
-            image = generate_test_image()
+            image = TEST_IMAGE
             self.client.post(
                 "/api/ocr/upload",
                 files={"file": ("spike.png", image, "image/png")}
@@ -220,7 +222,7 @@ class EnduranceTestUser(FastHttpUser):
     def normal_workflow(self):
         """Simulate normal user workflow."""
         # Upload image
-        image = generate_test_image()
+        image = TEST_IMAGE
         response = self.client.post(
             "/api/ocr/upload",
             files={"file": ("endurance.png", image, "image/png")}